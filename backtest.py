@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import time
+import ccxt.async_support as ccxt
+from core.config import Config
+from core.backtest import download_history, load_history, run_backtest
+
+
+async def download(symbols, timeframe, days, directory):
+    exchange = ccxt.binance({'enableRateLimit': True, 'options': {'defaultType': 'spot'}})
+    since = int((time.time() - days * 86400) * 1000)
+    try:
+        for symbol in symbols:
+            data = await download_history(exchange, symbol, timeframe, since, directory=directory)
+            print(f"📥 {symbol}: {len(data)} candles")
+    finally:
+        await exchange.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest da estratégia GOLDEN ARRAY com os limites do Config")
+    parser.add_argument('--days', type=int, default=365, help="Dias de histórico a baixar")
+    parser.add_argument('--timeframe', default=getattr(Config, 'TIMEFRAME', '1m'))
+    parser.add_argument('--symbols', nargs='*', default=[p['symbol'] for p in Config.PAIRS])
+    parser.add_argument('--download', action='store_true', help="Baixa/completa o histórico antes de rodar")
+    parser.add_argument('--db', help="Grava os trades simulados num banco com o schema do trades_history.db")
+    args = parser.parse_args()
+
+    if args.download:
+        asyncio.run(download(args.symbols, args.timeframe, args.days, Config.BACKTEST_DATA_DIR))
+
+    data = load_history(Config.BACKTEST_DATA_DIR, args.symbols, args.timeframe)
+    if not data:
+        print("❌ Sem histórico. Rode com --download primeiro.")
+        return
+
+    t0 = time.perf_counter()
+    result = run_backtest(data, Config)
+    elapsed = time.perf_counter() - t0
+    candles = sum(len(d) for d in data.values())
+
+    summary = result.summary()
+    print(f"⏱️ {candles} candles de {len(data)} pares em {elapsed:.2f}s")
+    print(f"📊 Trades: {summary['trades']} | PnL: ${summary['pnl']:.2f} | Acerto: {summary['win_rate']*100:.1f}% "
+          f"| Drawdown máx: ${summary['max_drawdown']:.2f} | Abertos: {summary['open']}")
+    print(f"🔎 Saídas: {summary['reasons']}")
+    for symbol, (count, pnl) in sorted(result.by_symbol().items(), key=lambda x: -x[1][1]):
+        print(f"   {symbol:<12} {count:>4} vendas  ${pnl:.2f}")
+
+    if args.db:
+        result.save(args.db)
+        print(f"💾 Trades gravados em {args.db}")
+
+
+if __name__ == "__main__":
+    main()
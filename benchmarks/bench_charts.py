@@ -0,0 +1,9 @@
+from core.config import Config
+from core.charts import render_chart_png
+from benchmarks.fixtures import candles
+
+
+def run(bench):
+    ohlcv = next(iter(candles(1).values()))
+    # Custo de um gráfico do send_chart (roda no processo worker do ChartRenderer)
+    bench.time("charts.render_png", lambda: render_chart_png(ohlcv, Config.SMA_PERIODS, 'SOL/USDT', 'COMPRA', ohlcv[-1][4]), repeat=5)
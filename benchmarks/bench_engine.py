@@ -0,0 +1,34 @@
+import asyncio
+from benchmarks.fixtures import BenchConfig, workdir, shutdown
+
+
+def run(bench):
+    from core.engine import TradingEngine
+    import queue
+
+    with workdir():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        engine = TradingEngine(queue.Queue(), BenchConfig)
+        engine.running = True
+
+        # Primeiro ciclo baixa os 600 candles de cada par; os seguintes são o regime normal
+        loop.run_until_complete(engine.markets.load())
+        loop.run_until_complete(engine.trading_cycle())
+        bench.time("engine.trading_cycle[13]", lambda: loop.run_until_complete(engine.trading_cycle()), repeat=30)
+        engine.update_queue.queue.clear()
+
+        # _save_state sob trailing: 1000 atualizações de highest_price seguidas
+        engine.active_trades = {p['symbol']: {'entry': 1.0, 'qty': 10.0, 'time': 0, 'highest_price': 1.0}
+                                for p in BenchConfig.PAIRS[:BenchConfig.MAX_OPEN_TRADES]}
+
+        async def churn():
+            for i in range(1000):
+                for trade in engine.active_trades.values():
+                    trade['highest_price'] = 1.0 + i * 1e-4
+                engine._save_state()
+            await engine.state.flush()
+
+        bench.time("engine.save_state_churn[1000]", lambda: loop.run_until_complete(churn()), repeat=10)
+
+        shutdown(loop, engine)
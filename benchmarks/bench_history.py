@@ -0,0 +1,30 @@
+import asyncio
+import random
+import time
+from core.history import TradeHistory
+from benchmarks.fixtures import workdir, symbols
+
+
+def run(bench, rows=50000):
+    with workdir():
+        history = TradeHistory('bench_history.db')
+        rng = random.Random(0)
+        now = time.time()
+        data = []
+        for i in range(rows):
+            ts = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now - (rows - i) * 600))
+            side = 'SELL' if i % 2 else 'BUY'
+            data.append((rng.choice(symbols(13)), side, 1.0, 10.0, rng.uniform(-1, 1) if side == 'SELL' else None, ts))
+        history.conn.executemany("INSERT INTO trades (symbol, side, price, qty, pnl, timestamp) VALUES (?, ?, ?, ?, ?, ?)", data)
+        history.conn.commit()
+        history.stats.load(history.conn)
+
+        loop = asyncio.new_event_loop()
+        today = time.strftime('%Y-%m-%d')
+        bench.time(f"history.stats_summary_day[{rows}]", lambda: history.stats.summary(today), repeat=1000)
+        bench.time(f"history.stats_top_symbols[{rows}]", lambda: history.stats.top_symbols(5), repeat=1000)
+        bench.time(f"history.stats_recent_sells[{rows}]", lambda: history.stats.recent_sells(10), repeat=1000)
+        bench.time(f"history.record[{rows}]", lambda: loop.run_until_complete(history.record('SOL/USDT', 'SELL', 1.0, 1.0, 0.1)), repeat=100)
+        bench.time(f"history.load_stats[{rows}]", lambda: history.stats.load(history.conn), repeat=5)
+        history.close()
+        loop.close()
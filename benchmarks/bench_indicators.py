@@ -0,0 +1,63 @@
+import numpy as np
+from core.config import Config
+from core.indicators import compute_frame, compute_batch, stack_closes, batch_row, IncrementalIndicators
+from benchmarks.fixtures import candles, next_candle
+
+
+def assert_matches(label, values, ohlcv):
+    """Valores do caminho rápido == última linha do compute_frame (Pandas), NaN incluído"""
+    ref = compute_frame(ohlcv, Config).iloc[-1]
+    # O rolling().std() do Pandas carrega ruído das somas corridas (~1e-8 do preço numa janela plana)
+    atol = 1e-7 * abs(ref['close'])
+    for k, v in values.items():
+        if k != 'timestamp':
+            assert np.isclose(v, ref[k], rtol=1e-9, atol=atol, equal_nan=True), f"{label}: {k} = {v} (Pandas {ref[k]})"
+
+
+def check(periods, width):
+    """Incremental (rebuild, append, update_last) e lote conferidos contra o Pandas antes de cronometrar"""
+    data = list(candles(13).values())
+    data[1] = data[1][:30]                                      # Histórico curto: SMAs longas ficam NaN
+    data[2] = data[2][:-25] + [[c[0]] + [data[2][-26][4]] * 4 + [c[5]] for c in data[2][-25:]]   # Janela plana: std 0
+    rng = np.random.default_rng(1)
+    states = [IncrementalIndicators(periods) for _ in data]
+    for i, (state, o) in enumerate(zip(states, data)):
+        assert_matches(f"rebuild[{i}]", state.sync(o), o)
+        # Primeiro par passa pelo recálculo periódico das somas (a cada 'capacity' mudanças); os outros, poucos candles
+        for step in range(state.capacity // 2 + 5 if i == 0 else 5):
+            o.append(next_candle(o, rng))
+            assert_matches(f"append[{i}]", state.sync(o), o)
+            o[-1] = o[-1][:4] + [o[-1][4] * (1.001 if step % 2 else 0.999), o[-1][5]]
+            assert_matches(f"update_last[{i}]", state.sync(o), o)
+        assert_matches(f"rebuild_gap[{i}]", state.sync(o[:-5]), o[:-5])   # Cache voltou no tempo: refaz do zero
+
+    batch = compute_batch(stack_closes(data, width), periods)
+    for i, o in enumerate(data):
+        assert_matches(f"batch[{i}]", batch_row(batch, i), o)
+    print(f"  indicadores conferidos com o Pandas: {len(data)} pares (incremental e lote)")
+
+
+def run(bench):
+    periods = Config.SMA_PERIODS
+    width = max(periods + [20, 15])
+    check(periods, width)
+    for n in (13, 100, 500):
+        data = list(candles(n).values())
+
+        # Referência Pandas: DataFrame completo por par (o que o ciclo fazia antes)
+        bench.time(f"indicators.pandas_frame[{n}]", lambda: [compute_frame(o, Config) for o in data], repeat=3)
+
+        # NumPy em lote: universo inteiro numa passada
+        bench.time(f"indicators.batch[{n}]", lambda: compute_batch(stack_closes(data, width), periods), repeat=20)
+
+        # Incremental: um candle novo por par (regime normal do ciclo)
+        states = [IncrementalIndicators(periods) for _ in data]
+        for s, o in zip(states, data):
+            s.sync(o)
+        rng = np.random.default_rng(0)
+
+        def tick():
+            for s, o in zip(states, data):
+                o.append(next_candle(o, rng))
+                s.sync(o)
+        bench.time(f"indicators.incremental_tick[{n}]", tick, repeat=50)
@@ -0,0 +1,73 @@
+import asyncio
+import numpy as np
+from benchmarks.fixtures import BenchConfig, workdir, shutdown, next_candle
+from core.market_stream import ReplaySource
+
+
+def replay_events(engine, length, rng):
+    """Klines que continuam o cache de cada par + um ticker 24h por par"""
+    events = []
+    for p in engine.pairs:
+        s = p['symbol']
+        ohlcv = [list(c) for c in engine.candles.get(s)[-2:]]
+        events.append(('ticker', s, {'symbol': s, 'last': ohlcv[-1][4], 'quoteVolume': 1e9}))
+        for _ in range(length):
+            ohlcv.append(next_candle(ohlcv, rng))
+            events.append(('kline', s, ohlcv[-1], True))
+    return events
+
+
+async def replay(engine, events):
+    """Roda o motor contra o ReplaySource até consumir todos os eventos"""
+    source = ReplaySource(events)
+    await engine.start_stream(source)
+    while source.running:
+        await asyncio.sleep(0)
+    return source
+
+
+def run(bench, length=200):
+    from core.engine import TradingEngine
+    import queue
+
+    with workdir():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        engine = TradingEngine(queue.Queue(), BenchConfig)
+        engine.running = True
+        rng = np.random.default_rng(0)
+
+        # Histórico inicial pelo REST (o stream só continua o cache)
+        loop.run_until_complete(engine.markets.load())
+        loop.run_until_complete(engine.trading_cycle())
+
+        def stream_klines():
+            events = replay_events(engine, length, rng)
+            loop.run_until_complete(replay(engine, events))
+            loop.run_until_complete(engine.stream.stop())
+            engine.stream = None
+            return events
+
+        n = len(engine.pairs)
+        bench.time(f"engine.replay_klines[{n}x{length}]", stream_klines, repeat=10)
+
+        # Conferência: o motor usou os candles e tickers do replay, não o REST da corretora simulada
+        events = stream_klines()
+        last = {e[1]: e[2] for e in events if e[0] == 'kline'}
+        source = loop.run_until_complete(replay(engine, []))
+        source.running = True   # Stream "ao vivo" e sem eventos novos: o ciclo lê do cache do stream
+        engine.stream = source
+        engine.update_queue.queue.clear()
+        loop.run_until_complete(engine.trading_cycle())
+        snapshots = {}
+        while not engine.update_queue.empty():
+            kind, payload = engine.update_queue.get()
+            if kind == 'pairs_data':
+                snapshots.update({r['symbol']: r for r in payload})
+        for s, candle in last.items():
+            assert engine.candles.get(s)[-1] == candle, f"{s}: candle do replay não chegou ao cache"
+            assert engine.stream_tickers[s]['quoteVolume'] == 1e9, f"{s}: ticker do replay não chegou ao motor"
+            assert snapshots.get(s, {}).get('candle_ts') == candle[0], f"{s}: ciclo não decidiu pelo candle do replay"
+        print(f"  replay conferido: {len(last)} pares decididos pelos candles do stream")
+
+        shutdown(loop, engine)
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from core.config import Config
+from core.sim_exchange import synthetic_candles
+
+
+def symbols(n):
+    """Os pares do Config primeiro, depois pares fictícios até completar n"""
+    names = [p['symbol'] for p in Config.PAIRS]
+    return (names + [f"SYM{i}/USDT" for i in range(len(names), n)])[:n]
+
+
+def candles(n_symbols, length=600, seed=0):
+    """symbol -> lista de candles [ts, o, h, l, c, v] sintéticos (mesmo formato do ccxt)"""
+    return {s: synthetic_candles(length, price=1.0 + i, seed=seed + i).tolist() for i, s in enumerate(symbols(n_symbols))}
+
+
+def next_candle(ohlcv, rng):
+    last = ohlcv[-1]
+    close = last[4] * float(np.exp(rng.normal(0, 0.002)))
+    return [last[0] + 60000, last[4], max(last[4], close), min(last[4], close), close, last[5]]
+
+
+class BenchConfig(Config):
+    """Config do benchmark: corretora simulada parada no tempo, sem latência, sem Telegram"""
+    SIM_EXCHANGE = True
+    SIM_SPEED = 0.0
+    SIM_LATENCY = 0.0
+    MARKET_DATA_MODE = 'REST'
+    INDICATOR_MODE = 'INCREMENTAL'
+
+
+@contextmanager
+def workdir():
+    """Diretório temporário (apagado no fim): o motor grava trades_history.db e active_trades.json no diretório atual"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="quantum-bench-") as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(cwd)
+
+
+def shutdown(loop, engine):
+    """Cancela e espera as tarefas de fundo do motor (refresh de mercados, flush do estado), fecha o loop e os arquivos"""
+    tasks = asyncio.all_tasks(loop)
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    loop.close()
+    engine.state.close()
+    engine.history.close()
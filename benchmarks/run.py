@@ -0,0 +1,91 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SUITES = ['indicators', 'engine', 'stream', 'history', 'charts']
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+
+class Bench:
+    """Cronometra cada caso (1 aquecimento + 'repeat' execuções) e guarda mediana/p95/mínimo em ms"""
+
+    def __init__(self, pattern=None):
+        self.pattern = pattern
+        self.results = {}
+
+    def time(self, name, fn, repeat=10):
+        if self.pattern and self.pattern not in name:
+            return
+        fn()
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        self.results[name] = {
+            'median_ms': statistics.median(samples),
+            'p95_ms': samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+            'min_ms': samples[0],
+            'runs': repeat,
+        }
+        print(f"  {name:<45} {self.results[name]['median_ms']:>10.3f} ms  (p95 {self.results[name]['p95_ms']:.3f})", flush=True)
+
+
+def compare(results, baseline):
+    """Diferença da mediana contra o baseline gravado (positivo = mais lento)"""
+    print("\n📊 Comparação com o baseline:")
+    for name, r in results.items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            print(f"  {name:<45} {'(novo)':>10}")
+            continue
+        diff = (r['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0.0
+        flag = " ⚠️" if diff > 10 else ""
+        print(f"  {name:<45} {old['median_ms']:>10.3f} -> {r['median_ms']:.3f} ms ({diff:+.1f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks dos caminhos quentes do motor (offline)")
+    parser.add_argument('suites', nargs='*', default=SUITES, help=f"Suítes a rodar ({', '.join(SUITES)})")
+    parser.add_argument('-k', dest='pattern', help="Só os casos cujo nome contém esse texto")
+    parser.add_argument('--save', action='store_true', help="Grava os resultados como novo baseline")
+    parser.add_argument('--baseline', default=BASELINE)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    bench = Bench(args.pattern)
+    for suite in args.suites:
+        print(f"⏱️ {suite}")
+        try:
+            importlib.import_module(f"benchmarks.bench_{suite}").run(bench)
+        except ImportError as e:
+            print(f"  (pulado: dependência ausente - {e})")
+        finally:
+            os.chdir(cwd)
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            compare(bench.results, json.load(f))
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+                'results': bench.results,
+            }, f, indent=2)
+        print(f"💾 Baseline gravado em {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
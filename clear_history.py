@@ -1,5 +1,4 @@
-import json
-import os
+from core.state_store import StateStore
 
 def reset_active_trades():
     file_path = 'active_trades.json'
@@ -7,8 +6,7 @@ def reset_active_trades():
     empty_data = {}
     
     try:
-        with open(file_path, 'w') as f:
-            json.dump(empty_data, f)
+        StateStore(file_path).write(empty_data)
         print("✅ Memória de trades ativos (JSON) zerada com sucesso!")
         print("💡 O bot agora ignora qualquer trade aberto anteriormente.")
     except Exception as e:
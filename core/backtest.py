@@ -0,0 +1,302 @@
+import heapq
+import os
+import time
+from collections import Counter
+import numpy as np
+
+try:
+    from numba import njit  # Opcional: compila o laço de saídas
+except ImportError:
+    njit = None
+
+# Motivos de saída (códigos usados dentro do laço compilado)
+OPEN, STOP_LOSS, BREAK_EVEN_EXIT, TRAILING_PROFIT, TAKE_PROFIT, ZOMBIE = range(6)
+REASONS = ['OPEN', 'STOP_LOSS', 'BREAK_EVEN_EXIT', 'TRAILING_PROFIT', 'TAKE_PROFIT', 'ZOMBIE']
+
+# Mesmos cooldowns do motor (segundos)
+COOLDOWN = {STOP_LOSS: 300, BREAK_EVEN_EXIT: 300, TRAILING_PROFIT: 300, TAKE_PROFIT: 300, ZOMBIE: 600}
+
+
+# --- DADOS HISTÓRICOS ---
+def history_path(directory, symbol, timeframe):
+    return os.path.join(directory, f"{symbol.replace('/', '_')}_{timeframe}.npy")
+
+
+def load_history(directory, symbols, timeframe='1m'):
+    """symbol -> array (n, 6) [ts, o, h, l, c, v] dos arquivos baixados por download_history"""
+    data = {}
+    for symbol in symbols:
+        path = history_path(directory, symbol, timeframe)
+        if os.path.exists(path):
+            data[symbol] = np.load(path)
+    return data
+
+
+async def download_history(exchange, symbol, timeframe, since, until=None, directory='backtest_data'):
+    """Baixa (ou completa) o histórico de um par em páginas de 1000 candles e grava em .npy"""
+    os.makedirs(directory, exist_ok=True)
+    path = history_path(directory, symbol, timeframe)
+    cached = np.load(path) if os.path.exists(path) else np.empty((0, 6))
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    until = until or int(time.time() * 1000)
+
+    # Já tem o começo do período: só baixa o que falta depois do último candle gravado
+    if len(cached) and cached[0, 0] <= since:
+        chunks, start = [cached], int(cached[-1, 0]) + tf_ms
+    else:
+        chunks, start = [], since
+    while start < until:
+        page = await exchange.fetch_ohlcv(symbol, timeframe, since=start, limit=1000)
+        if not page: break
+        chunks.append(np.asarray(page, dtype=np.float64))
+        start = int(page[-1][0]) + tf_ms
+
+    data = np.concatenate(chunks) if chunks else cached
+    if len(data):
+        # Remove repetidos e o candle em formação
+        _, first = np.unique(data[:, 0], return_index=True)
+        data = data[first]
+        data = data[data[:, 0] + tf_ms <= until]
+    np.save(path, data)
+    return data
+
+
+# --- INDICADORES VETORIZADOS (mesmas fórmulas de compute_frame) ---
+def _rolling_mean(x, w):
+    out = np.full(len(x), np.nan)
+    if len(x) >= w:
+        c = np.concatenate(([0.0], np.cumsum(x)))
+        out[w - 1:] = (c[w:] - c[:-w]) / w
+    return out
+
+
+def _rolling_std(x, w, chunk=100000):
+    """Desvio padrão amostral (ddof=1) em blocos: janela exata, sem somas acumuladas"""
+    out = np.full(len(x), np.nan)
+    if len(x) < w:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, w)
+    for i in range(0, len(windows), chunk):
+        out[w - 1 + i:w - 1 + i + chunk] = windows[i:i + chunk].std(axis=1, ddof=1)
+    return out
+
+
+def prepare(ohlcv, sma_periods=(20, 200, 500)):
+    """
+    Arrays do par para o backtest: closes, SMAs, RSI 14, Bollinger inferior e volume 24h em USDT.
+    Os preços são normalizados pelo primeiro close para as somas acumuladas não perderem precisão (PEPE etc).
+    """
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    close = ohlcv[:, 4]
+    base = close[0] if len(close) else 1.0
+    x = close / base
+
+    series = {'ts': ohlcv[:, 0].astype(np.int64), 'close': close}
+    for p in sorted(set(sma_periods) | {20, 200, 500}):
+        series[f'sma_{p}'] = _rolling_mean(x, p) * base
+
+    # RSI: o Pandas troca o primeiro delta (NaN) por 0
+    delta = np.diff(x, prepend=x[:1])
+    gain = _rolling_mean(np.where(delta > 0, delta, 0.0), 14)
+    loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), 14)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series['rsi'] = 100 - (100 / (1 + gain / loss))
+
+    std = _rolling_std(x, 20) * base
+    series['lower_bb'] = series['sma_20'] - std * 2
+
+    # Volume 24h em USDT (aproximação do quoteVolume do ticker)
+    tf_ms = float(np.median(np.diff(ohlcv[:1000, 0]))) if len(ohlcv) > 1 else 60000.0
+    volume_window = max(1, int(86400000 // tf_ms))
+    series['quote_volume'] = _rolling_mean(ohlcv[:, 5] * close, volume_window) * volume_window
+    return series
+
+
+def entry_signals(series, rsi_oversold, min_volume=0.0):
+    """Índices dos candles com sinal GOLDEN ARRAY (mesmas condições de _decide)"""
+    price = series['close']
+    with np.errstate(invalid='ignore'):
+        signal = ((price > series['sma_200']) & (price > series['sma_500'])   # Tendência macro
+                  & (price < series['sma_20'])                                 # Pullback
+                  & (series['rsi'] < rsi_oversold)
+                  & (price <= series['lower_bb']))
+        if min_volume > 0:
+            signal &= series['quote_volume'] >= min_volume
+    return np.flatnonzero(signal)
+
+
+# --- SAÍDAS (dependem do caminho: laço por trade) ---
+def _scan_exit(close, ts, start, stop_loss, use_break_even, break_even_trigger,
+               use_trailing, trailing_activation, trailing_callback, take_profit, zombie_ms):
+    """Replica a gestão do _decide candle a candle a partir da entrada em 'start'. Devolve (índice, motivo)"""
+    entry = close[start]
+    secured = False
+    highest = 0.0
+    for j in range(start + 1, close.shape[0]):
+        price = close[j]
+        profit = (price - entry) / entry
+
+        # Break-even: o stop deste candle ainda usa o estado anterior (igual ao motor)
+        was_secured = secured
+        if use_break_even and not secured and profit >= break_even_trigger:
+            secured = True
+        stop_price = entry * 1.001 if was_secured else entry * (1 - stop_loss)
+        if price <= stop_price:
+            return j, BREAK_EVEN_EXIT if was_secured else STOP_LOSS
+
+        top = highest
+        if use_trailing:
+            if top == 0 and profit >= trailing_activation:
+                highest = price
+            elif top > 0:
+                if price > top:
+                    highest = price
+                if (top - price) / top >= trailing_callback:
+                    return j, TRAILING_PROFIT
+        elif profit >= take_profit:
+            return j, TAKE_PROFIT
+
+        if top == 0 and ts[j] - ts[start] >= zombie_ms:
+            return j, ZOMBIE
+    return -1, OPEN
+
+
+if njit is not None:
+    _scan_exit = njit(cache=True)(_scan_exit)
+
+
+# --- PORTFÓLIO ---
+def _params(config, overrides):
+    get = lambda name, default=None: overrides.get(name, getattr(config, name, default))
+    return {
+        'RSI_OVERSOLD': get('RSI_OVERSOLD'),
+        'MAX_OPEN_TRADES': get('MAX_OPEN_TRADES'),
+        'TRADE_AMOUNT': get('TRADE_AMOUNT'),
+        'MIN_VOLUME_24H': get('MIN_VOLUME_24H', 0.0),
+        'STOP_LOSS': get('STOP_LOSS'),
+        'USE_BREAK_EVEN': get('USE_BREAK_EVEN', False),
+        'BREAK_EVEN_TRIGGER': get('BREAK_EVEN_TRIGGER', 0.0),
+        'USE_TRAILING_STOP': get('USE_TRAILING_STOP', False),
+        'TRAILING_ACTIVATION': get('TRAILING_ACTIVATION', 0.0),
+        'TRAILING_CALLBACK': get('TRAILING_CALLBACK', 0.0),
+        'TAKE_PROFIT': get('TAKE_PROFIT', 0.025),
+        'ZOMBIE_TIMEOUT': get('ZOMBIE_TIMEOUT'),
+        'BACKTEST_FEE': get('BACKTEST_FEE', 0.0),
+    }
+
+
+def _stamp(ms):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ms / 1000))
+
+
+def simulate(prepared, config, **overrides):
+    """
+    Roda a estratégia sobre os arrays de prepare() de vários pares, respeitando MAX_OPEN_TRADES no portfólio.
+    Entradas e saídas no close do candle (o motor ao vivo avalia o candle em formação).
+    'overrides' troca qualquer limite do Config (ex: RSI_OVERSOLD=25) sem alterar a classe.
+    """
+    p = _params(config, overrides)
+    symbols = list(prepared)
+    fee = p['BACKTEST_FEE']
+    zombie_ms = int(p['ZOMBIE_TIMEOUT'] * 1000)
+
+    signals = [entry_signals(prepared[s], p['RSI_OVERSOLD'], p['MIN_VOLUME_24H']) for s in symbols]
+    signal_ts = [prepared[s]['ts'][sig] for s, sig in zip(symbols, signals)]
+    pending = [(int(st[0]), k, 0) for k, st in enumerate(signal_ts) if len(st)]
+    heapq.heapify(pending)
+
+    blocked_until = [0.0] * len(symbols)  # Em trade ou em cooldown até esse timestamp
+    exits = []                           # heap de (ts da saída) das posições abertas
+    trades, open_positions, reasons = [], [], Counter()
+
+    while pending:
+        t, k, pos = heapq.heappop(pending)
+        # Saídas do mesmo candle liberam o slot antes das entradas
+        while exits and exits[0] <= t:
+            heapq.heappop(exits)
+
+        s, sig, series = symbols[k], signals[k], prepared[symbols[k]]
+        if t >= blocked_until[k] and len(exits) < p['MAX_OPEN_TRADES']:
+            i = int(sig[pos])
+            close, ts = series['close'], series['ts']
+            j, reason = _scan_exit(close, ts, i, p['STOP_LOSS'], p['USE_BREAK_EVEN'], p['BREAK_EVEN_TRIGGER'],
+                                   p['USE_TRAILING_STOP'], p['TRAILING_ACTIVATION'], p['TRAILING_CALLBACK'],
+                                   p['TAKE_PROFIT'], zombie_ms)
+            entry = float(close[i])
+            qty = p['TRADE_AMOUNT'] / entry
+            trades.append((s, 'BUY', entry, qty, None, int(ts[i])))
+            if j < 0:
+                open_positions.append((s, entry, qty, float(close[-1])))
+                heapq.heappush(exits, float('inf'))
+                blocked_until[k] = float('inf')
+            else:
+                exit_price = float(close[j])
+                pnl = (exit_price - entry) * qty - (entry + exit_price) * qty * fee
+                trades.append((s, 'SELL', exit_price, qty, pnl, int(ts[j])))
+                reasons[REASONS[reason]] += 1
+                heapq.heappush(exits, int(ts[j]))
+                blocked_until[k] = int(ts[j]) + COOLDOWN[reason] * 1000
+            # Próximo sinal depois da saída + cooldown
+            nxt = int(np.searchsorted(signal_ts[k], blocked_until[k], side='left'))
+        else:
+            nxt = pos + 1
+        if nxt < len(sig):
+            heapq.heappush(pending, (int(signal_ts[k][nxt]), k, nxt))
+
+    trades.sort(key=lambda r: (r[5], r[1] == 'BUY'))  # No mesmo candle, saídas antes das entradas
+    return BacktestResult(trades, open_positions, reasons)
+
+
+class BacktestResult:
+    """Trades no formato da tabela 'trades' (symbol, side, price, qty, pnl, timestamp) + métricas"""
+
+    def __init__(self, trades, open_positions, reasons):
+        self.raw = trades
+        self.open_positions = open_positions
+        self.reasons = reasons
+        pnl = np.array([r[4] for r in trades if r[1] == 'SELL'])
+        self.count = len(pnl)
+        self.pnl = float(pnl.sum()) if len(pnl) else 0.0
+        self.win_rate = float((pnl > 0).mean()) if len(pnl) else 0.0
+        equity = np.cumsum(pnl) if len(pnl) else np.zeros(1)
+        self.max_drawdown = float((np.maximum.accumulate(np.maximum(equity, 0)) - equity).max())
+
+    @property
+    def trades(self):
+        return [(s, side, price, qty, pnl, _stamp(ts)) for s, side, price, qty, pnl, ts in self.raw]
+
+    def by_symbol(self):
+        out = {}
+        for s, side, _, _, pnl, _ in self.raw:
+            if side == 'SELL':
+                row = out.setdefault(s, [0, 0.0])
+                row[0] += 1
+                row[1] += pnl
+        return out
+
+    def summary(self):
+        return {
+            'trades': self.count,
+            'pnl': self.pnl,
+            'win_rate': self.win_rate,
+            'max_drawdown': self.max_drawdown,
+            'open': len(self.open_positions),
+            'reasons': dict(self.reasons),
+        }
+
+    def save(self, path):
+        """Grava os trades num banco com o mesmo schema do trades_history.db"""
+        from core.history import TradeHistory
+        history = TradeHistory(path)
+        try:
+            history.conn.executemany(
+                "INSERT INTO trades (symbol, side, price, qty, pnl, timestamp) VALUES (?, ?, ?, ?, ?, ?)", self.trades)
+            history.conn.commit()
+        finally:
+            history.close()
+
+
+def run_backtest(data, config, **overrides):
+    """data: symbol -> OHLCV (lista do ccxt ou array). Indicadores vetorizados + simulação do portfólio"""
+    prepared = {s: prepare(ohlcv, config.SMA_PERIODS) for s, ohlcv in data.items() if len(ohlcv)}
+    return simulate(prepared, config, **overrides)
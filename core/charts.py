@@ -0,0 +1,99 @@
+import asyncio
+import io
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+
+def render_chart_png(ohlcv, sma_periods, symbol, side, price, pnl_str=None):
+    """Roda no processo worker: candles crus -> indicadores -> PNG (bytes)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import mplfinance as mpf
+    from core.indicators import compute_frame
+
+    df = compute_frame(ohlcv, SimpleNamespace(SMA_PERIODS=sma_periods))
+
+    # 1. Prepara os dados (Pega os últimos 50 candles para não poluir)
+    df_chart = df.tail(50).copy()
+
+    # 2. Configura o Estilo (Preto e Neon - Estilo Hacker)
+    s = mpf.make_mpf_style(base_mpf_style='nightclouds', rc={'font.size': 8})
+
+    # 3. Adiciona Indicadores (Rainbow SMAs)
+    lines = [
+        ('lower_bb', 'green', 0.8),
+        # Curtas (Cores Quentes)
+        ('sma_3', 'yellow', 0.5), ('sma_10', 'orange', 0.8), ('sma_20', 'red', 1.0),
+        # Longas (Cores Frias/Sólidas)
+        ('sma_50', 'cyan', 1.0), ('sma_100', 'blue', 1.2), ('sma_200', 'purple', 1.5),
+        ('sma_500', 'black', 2.0),  # A Muralha
+    ]
+    apds = [mpf.make_addplot(df_chart[col], color=color, width=width)
+            for col, color, width in lines if col in df_chart.columns and df_chart[col].notna().any()]
+
+    # 4. Salva o gráfico na memória (Buffer)
+    buf = io.BytesIO()
+    title = f"{symbol} - {side} @ {price}"
+    if pnl_str: title += f" ({pnl_str})"
+
+    mpf.plot(
+        df_chart,
+        type='candle',
+        style=s,
+        addplot=apds,
+        title=title,
+        volume=False,
+        savefig=dict(fname=buf, dpi=100, bbox_inches='tight'),
+        warn_too_much_data=10000  # Silencia avisos
+    )
+    return buf.getvalue()
+
+
+class ChartRenderer:
+    """
+    Pool de processos para os gráficos do Telegram: o matplotlib nunca roda no event loop.
+    Fila limitada por par: um gráfico novo do mesmo par substitui o pendente; fila cheia descarta o mais antigo.
+    """
+
+    def __init__(self, workers=1, max_queue=4):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = OrderedDict()   # symbol -> (args, callback)
+        self.in_flight = 0
+        self.dropped = 0
+        self.pool = None
+
+    def submit(self, symbol, args, callback):
+        if symbol in self.pending:
+            del self.pending[symbol]   # Junta: só o gráfico mais recente do par interessa
+        elif len(self.pending) >= self.max_queue:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.pending[symbol] = (args, callback)
+        self._pump()
+
+    def _pump(self):
+        while self.in_flight < self.workers and self.pending:
+            _, job = self.pending.popitem(last=False)
+            self.in_flight += 1
+            asyncio.create_task(self._run(*job))
+
+    async def _run(self, args, callback):
+        try:
+            if self.pool is None:
+                # spawn (igual aos shards): fork de um processo com threads (Tk, asyncio, executores) pode travar
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            loop = asyncio.get_running_loop()
+            png = await loop.run_in_executor(self.pool, render_chart_png, *args)
+            await callback(png)
+        except Exception as e:
+            print(f"❌ Erro ao gerar gráfico: {e}")
+        finally:
+            self.in_flight -= 1
+            self._pump()
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
@@ -20,6 +20,12 @@ class Config:
         {'symbol': 'FTM/USDT'}, {'symbol': 'INJ/USDT'}              # Alta Beta
     ]
     
+    # --- FONTE DE DADOS ---
+    # REST: polling a cada ciclo | STREAM: WebSocket de klines + ticker 24h (saídas em milissegundos)
+    MARKET_DATA_MODE = os.getenv("MARKET_DATA_MODE", "REST").upper()
+    STREAM_URL = os.getenv("STREAM_URL")   # Vazio = Binance. Aponte para um replay local em testes
+    STREAM_STALE_SECONDS = 10              # Sem mensagens por esse tempo -> volta para o REST
+
     # SEGURANÇA ALTCOIN
     MIN_24H_VOLUME = 10000000 # Mínimo 10 Milhões de dólares de volume
     
@@ -52,9 +58,22 @@ class Config:
     # Lista completa de médias solicitadas
     SMA_PERIODS = [3, 10, 20, 50, 100, 200, 500]
     
+    # --- AGENDAMENTO DO MOTOR ---
+    # CYCLE: trading_cycle a cada 1s | SCHEDULER: entradas no fechamento do candle, saídas a cada EXIT_CHECK_INTERVAL
+    ENGINE_LOOP = os.getenv("ENGINE_LOOP", "CYCLE").upper()
+    EXIT_CHECK_INTERVAL = 1.0         # Segundos entre checagens de saída dos trades abertos
+    CANDLE_CLOSE_DELAY = 1.0          # Espera após o fechamento do candle antes de avaliar a entrada
+    SCHEDULER_REPORT_INTERVAL = 60    # Log de desempenho do agendador (segundos)
+
+    # INCREMENTAL: estado O(1) por par | BATCH: matriz pares x candles calculada de uma vez (NumPy)
+    INDICATOR_MODE = os.getenv("INDICATOR_MODE", "INCREMENTAL").upper()
+
     # --- IMPORTANTE: DADOS HISTÓRICOS ---
     # Para calcular a SMA 500, precisamos de no mínimo 600 candles
     LIMIT_CANDLES = 600
+    # Depois do primeiro download, cada ciclo só busca os candles novos (cache local)
+    # Se vierem CANDLE_DELTA_LIMIT ou mais, houve um buraco e o histórico é baixado de novo
+    CANDLE_DELTA_LIMIT = 10
     
     # --- FILTROS DE ESTRATÉGIA ---
     # Só opera se o preço estiver acima destas médias (Tendência Macro)
@@ -64,4 +83,59 @@ class Config:
     ZOMBIE_TIMEOUT = 7200      # 2 horas em segundos
 
     # --- FILTROS DE QUALIDADE ---
-    MIN_VOLUME_24H = 1000000.0  # (1 Milhão USD) Só opera moedas com alta liquidez
\ No newline at end of file
+    MIN_VOLUME_24H = 1000000.0  # (1 Milhão USD) Só opera moedas com alta liquidez
+    TICKER_TTL = 30             # Segundos que o snapshot de tickers (volume/preço/bid/ask) vale
+    MARKETS_REFRESH_INTERVAL = 3600  # Recarrega stepSize/minNotional/status dos mercados a cada 1h (em segundo plano)
+    BALANCE_RECONCILE_INTERVAL = 300 # Saldo local (ledger) é conferido com a Binance a cada 5 min ou após erro
+    STATE_FLUSH_DELAY = 0.5          # Alterações em active_trades.json dentro dessa janela viram uma escrita só
+
+    # --- GRÁFICOS DO TELEGRAM ---
+    CHART_WORKERS = 1       # Processos dedicados ao mplfinance (fora do loop de trading)
+    CHART_QUEUE_SIZE = 4    # Gráficos na fila; acima disso o mais antigo é descartado
+    TELEGRAM_MIN_INTERVAL = 1.0  # Segundos entre mensagens no chat (rajadas são agrupadas numa só)
+
+    # --- TERMINAL (GUI) ---
+    GUI_FRAME_INTERVAL = 0.25  # Tabela/saldo redesenhados no máximo 4x por segundo (só o dado mais recente)
+
+    # --- ORÇAMENTO DE PESO DA API (Binance: 6000 de peso por minuto por IP) ---
+    WEIGHT_LIMIT_PER_MINUTE = 6000
+    WEIGHT_BUDGET_USAGE = 0.8    # Usa no máximo 80% do limite (sobra para o app/outros bots no mesmo IP)
+    WEIGHT_SCAN_RESERVE = 0.25   # Varredura de entradas nunca consome os últimos 25% (ficam para saídas e ordens)
+    WEIGHT_SCAN_MAX_WAIT = 2.0   # Varredura que teria que esperar mais que isso é descartada no ciclo
+
+    # --- BACKTEST (backtest.py) ---
+    BACKTEST_DATA_DIR = "backtest_data"  # Candles históricos baixados (.npy por par)
+    BACKTEST_FEE = 0.001                 # Taxa por lado (0.1% taker da Binance) descontada do PnL simulado
+
+    # --- CORRETORA SIMULADA (paper trading / testes de carga sem a Binance) ---
+    SIM_EXCHANGE = os.getenv("SIM_EXCHANGE", "FALSE").upper() == "TRUE"
+    SIM_SPEED = float(os.getenv("SIM_SPEED", "1"))  # 60 = um candle de 1m por segundo (zombie, cooldowns e agendador seguem esse relógio)
+    SIM_LATENCY = 0.05      # Segundos até a ordem ser executada
+    SIM_SLIPPAGE = 0.0005   # 0.05% contra nós além do bid/ask
+    SIM_FEE = 0.001         # 0.1% por execução (cobrado em USDT)
+    SIM_BALANCE = 1000.0    # Saldo inicial em USDT
+    # Candles vêm de BACKTEST_DATA_DIR; pares sem histórico gravado usam candles sintéticos
+
+    # --- MÉTRICAS (latência por estágio + erros) ---
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # server.py expõe /metrics (Prometheus); 0 = desligado
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # Só local por padrão; 0.0.0.0 expõe para a rede
+    METRICS_REPORT_INTERVAL = 300  # Resumo das latências no log a cada 5 min
+
+    # --- EXECUÇÃO DE ORDENS ---
+    ORDER_RECV_WINDOW = 5000        # ms; o offset do relógio é medido, então a janela padrão basta
+    ORDER_KEEPALIVE_INTERVAL = 10   # Segundos entre GET /time (mantém a conexão quente e ressincroniza o relógio)
+
+    # --- UNIVERSO DE PARES ---
+    # FIXED: opera a lista PAIRS acima | SCAN: ranqueia todos os pares USDT (volume, volatilidade, spread) e opera o top-N
+    UNIVERSE_MODE = os.getenv("UNIVERSE_MODE", "FIXED").upper()
+    UNIVERSE_SIZE = 30                # Pares operados no modo SCAN
+    UNIVERSE_EXIT_FACTOR = 1.5        # Histerese: quem está dentro só sai se cair abaixo da posição 45 (30 x 1.5)
+    UNIVERSE_MAX_SPREAD = 0.002       # Spread máximo (0.2%) para entrar no ranking
+    UNIVERSE_REFRESH_INTERVAL = 300   # Novo ranking a cada 5 min (um fetch_tickers de todo o mercado)
+    UNIVERSE_QUOTE = "USDT"
+
+    # --- MOTOR EM VÁRIOS PROCESSOS (server.py) ---
+    # 0/1 = um processo só | N > 1 = pares divididos entre N processos; slots, estado, histórico e Telegram ficam no principal
+    ENGINE_SHARDS = int(os.getenv("ENGINE_SHARDS", "0"))
+    SLOT_RESERVE_TIMEOUT = 5.0  # Segundos que um shard espera o coordenador liberar um slot (sem resposta = não compra)
+    METRICS_PUSH_INTERVAL = 15  # Segundos entre os snapshots de métricas que cada shard manda para o /metrics do principal
@@ -1,10 +1,18 @@
 import asyncio
-import sqlite3
-import json
 import ccxt.async_support as ccxt
-import pandas as pd
 import time
-import os
+from core.market_data import CandleCache, TickerSnapshot
+from core.market_stream import BinanceStreamSource
+from core.markets import MarketMetadata
+from core.ledger import BalanceLedger
+from core.state_store import StateStore
+from core.history import TradeHistory
+from core.indicators import IncrementalIndicators, compute_batch, stack_closes, batch_row
+from core.sim_exchange import SimulatedExchange
+from core.metrics import METRICS
+from core.execution import OrderExecutor
+from core.universe import UniverseScanner
+from core.rate_limit import WeightBudget, BudgetedExchange, BudgetExceeded, request_priority, ORDER, EXIT, SCAN
 
 class TradingEngine:
     def __init__(self, update_queue, config, telegram=None):
@@ -15,33 +23,176 @@ class TradingEngine:
         self.cooldown_list = {} # Guarda o tempo da última venda de cada moeda
         self.telegram = telegram
         
-        self.exchange = ccxt.binance({
-            'apiKey': config.API_KEY, 
-            'secret': config.SECRET_KEY, 
-            'enableRateLimit': True,
-            'options': {'defaultType': 'spot'}
-        })
-        if config.SANDBOX_MODE: self.exchange.set_sandbox_mode(True)
+        self.sim = None
+        if getattr(config, 'SIM_EXCHANGE', False):
+            # Corretora local (paper trading / testes de carga), sem tocar na Binance
+            exchange = self.sim = SimulatedExchange.from_config(config)
+        else:
+            exchange = ccxt.binance({
+                'apiKey': config.API_KEY, 
+                'secret': config.SECRET_KEY, 
+                'enableRateLimit': True,
+                'options': {'defaultType': 'spot'}
+            })
+            if config.SANDBOX_MODE: exchange.set_sandbox_mode(True)
+
+        # Toda chamada REST passa pelo orçamento de peso: ordens > saídas > varredura
+        self.budget = self._weight_budget()
+        self.exchange = BudgetedExchange(exchange, self.budget)
         
+        self.candles = CandleCache(self.exchange, config)
+        self.tickers = TickerSnapshot(self.exchange, config)
+        self.markets = MarketMetadata(self.exchange, config)
+        self.ledger = BalanceLedger(self.exchange, config)
+        self.executor = OrderExecutor(self.exchange, self.markets, config)
+        self.pairs = list(config.PAIRS)    # Universo operado (fixo ou escolhido pelo UniverseScanner)
+        self.universe = UniverseScanner(self.exchange, config)
+        self.stream = None          # Fonte WebSocket (modo STREAM)
+        self.stream_tickers = {}    # Último ticker 24h recebido pelo stream
+        self.pair_locks = {}
+        self.indicators = {}        # Estado incremental de indicadores por par
         self.portfolio = {'available_capital': 0.0, 'floating_pnl': 0.0}
+        self.history = self._open_history()
+        self.history_version = -1
+        self.state = self._open_state()
         self._load_state()
 
+    # --- PONTOS DE EXTENSÃO (o ShardEngine troca por versões que falam com o processo principal) ---
+    def _weight_budget(self, share=1.0):
+        return WeightBudget(
+            getattr(self.config, 'WEIGHT_LIMIT_PER_MINUTE', 6000),
+            getattr(self.config, 'WEIGHT_BUDGET_USAGE', 0.8),
+            getattr(self.config, 'WEIGHT_SCAN_RESERVE', 0.25),
+            getattr(self.config, 'WEIGHT_SCAN_MAX_WAIT', 2.0),
+            share,
+        )
+
+    def _open_history(self):
+        return TradeHistory('trades_history.db')
+
+    def _open_state(self):
+        return StateStore('active_trades.json', getattr(self.config, 'STATE_FLUSH_DELAY', 0.5))
+
+    def _slots_used(self):
+        return len(self.active_trades)
+
+    async def _reserve_slot(self, symbol):
+        """Num processo só: a checagem de slots e o 'Pendente' acontecem sem await no meio, já é atômico"""
+        return True
+
+    # --- RELÓGIO DA ESTRATÉGIA ---
+    def now(self):
+        """Segundos no relógio do mercado: o da corretora simulada anda SIM_SPEED x mais rápido que o real"""
+        return float(self.sim.now()) / 1000 if self.sim else time.time()
+
+    @property
+    def speed(self):
+        """Segundos de mercado por segundo real (para converter esperas do agendador)"""
+        return self.sim.speed if self.sim and self.sim.speed > 0 else 1
+
     def _load_state(self):
-        if os.path.exists('active_trades.json'):
-            try:
-                with open('active_trades.json', 'r') as f: self.active_trades = json.load(f)
-            except: self.active_trades = {}
+        self.active_trades = self.state.load()
 
     def _save_state(self):
-        try:
-            with open('active_trades.json', 'w') as f: json.dump(self.active_trades, f)
-        except: pass
+        # Só marca como alterado: o StateStore agrupa e grava fora do loop (trailing a cada tick sem I/O)
+        self.state.save(self.active_trades)
+
+    async def _commit_state(self):
+        # Compra/venda executada: grava já, sem esperar a janela do StateStore (essa escrita não pode se perder)
+        await self.state.commit(self.active_trades)
 
     async def start(self):
-        await self.exchange.load_markets()
+        await self.markets.load()
+        await self.executor.start()
+        await self.start_stream()
         self.running = True
         self.update_queue.put(('log', "▶ MOTOR INICIADO - BUSCANDO ENTRADAS"))
 
+    async def start_stream(self, source=None):
+        """Liga o modo STREAM (klines + tickers empurrados). 'source' permite usar um replay local"""
+        if self.stream or (source is None and self.config.MARKET_DATA_MODE != 'STREAM'): return
+        self.stream = source or BinanceStreamSource(self.config)
+        self.stream.on_kline = self._on_kline
+        self.stream.on_ticker = self._on_ticker
+        timeframe = getattr(self.config, 'TIMEFRAME', '1m')
+        await self.stream.start([p['symbol'] for p in self.pairs], timeframe)
+        self.update_queue.put(('log', f"📡 STREAM CONECTADO: {len(self.pairs)} pares"))
+
+    async def refresh_universe(self):
+        """UNIVERSE_MODE=SCAN: reordena o mercado inteiro a cada UNIVERSE_REFRESH_INTERVAL e troca os pares operados"""
+        if self.config.UNIVERSE_MODE != 'SCAN' or not self.universe.is_due(): return
+        try:
+            await self.markets.ensure_loaded()
+            current = [p['symbol'] for p in self.pairs]
+            symbols, tickers = await self.universe.scan(current, self.active_trades.keys())
+        except Exception as e:
+            METRICS.count('errors', stage='universe_scan', error=type(e).__name__)
+            self.update_queue.put(('log', f"⚠️ Erro no scanner de mercado: {e}"))
+            return
+
+        # O snapshot do scan já serve de ticker para o ciclo (sem outro fetch_tickers)
+        self.tickers.update(tickers)
+        added = [s for s in symbols if s not in current]
+        removed = [s for s in current if s not in symbols]
+        if not added and not removed: return
+
+        self.pairs = [{'symbol': s} for s in symbols]
+        for s in removed:
+            self._evict(s)
+        self.update_queue.put(('universe', list(symbols)))
+        self.update_queue.put(('log', f"🔭 UNIVERSO: {len(symbols)} pares | +{len(added)} {' '.join(added[:5])} | -{len(removed)} {' '.join(removed[:5])}"))
+
+        # Stream assina só o universo atual: reconecta com a nova lista
+        if self.stream and self.config.MARKET_DATA_MODE == 'STREAM':
+            await self.stream.stop()
+            self.stream = None
+            await self.start_stream()
+
+    def _evict(self, symbol):
+        """Par saiu do universo: libera candles, indicadores e tickers dele"""
+        self.candles.evict(symbol)
+        self.indicators.pop(symbol, None)
+        self.stream_tickers.pop(symbol, None)
+        self.executor.templates.pop(symbol, None)
+        lock = self.pair_locks.get(symbol)
+        if lock is not None and not lock.locked():
+            del self.pair_locks[symbol]
+
+    def _stream_live(self):
+        return self.stream is not None and self.stream.is_live()
+
+    def _ticker(self, symbol):
+        """Ticker 24h mais recente: stream (se ativo) ou snapshot em lote"""
+        ticker = self.stream_tickers.get(symbol) if self._stream_live() else None
+        return ticker or self.tickers.get(symbol)
+
+    def _is_liquid(self, symbol):
+        ticker = self._ticker(symbol)
+        return bool(ticker) and (ticker.get('quoteVolume') or 0) >= self.config.MIN_VOLUME_24H
+
+    def _on_ticker(self, symbol, ticker):
+        self.stream_tickers[symbol] = ticker
+
+    def _on_kline(self, symbol, candle, closed):
+        timeframe = getattr(self.config, 'TIMEFRAME', '1m')
+        if not self.candles.apply_kline(symbol, candle, self.exchange.parse_timeframe(timeframe) * 1000):
+            return
+        # Posição aberta: checa a saída agora, sem esperar o próximo ciclo
+        trade = self.active_trades.get(symbol)
+        if trade and trade.get('status') != 'Pendente' and not self._pair_lock(symbol).locked():
+            asyncio.create_task(self._process_pair({'symbol': symbol}))
+
+    async def chart_frame(self, symbol):
+        """Candles + indicadores do par (DataFrame), montados só quando um gráfico precisa"""
+        # Cópia dos candles no loop do motor (quem atualiza/evicta o CandleCache), Pandas no executor;
+        # a GUI recebe só o DataFrame pronto pela fila
+        self.update_queue.put(('chart_frame', (symbol, await self.candles.frame(symbol, self.config))))
+
+    def _pair_lock(self, symbol):
+        if symbol not in self.pair_locks:
+            self.pair_locks[symbol] = asyncio.Lock()
+        return self.pair_locks[symbol]
+
     async def stop(self):
         self.running = False
         self.update_queue.put(('log', "⏸ MOTOR PAUSADO"))
@@ -49,56 +200,79 @@ class TradingEngine:
     def _check_daily_limits(self):
         return True
 
-    async def _process_pair(self, pair):
+    async def _process_pair(self, pair, closed=False):
+        # Ciclo e stream podem disparar o mesmo par ao mesmo tempo: nunca vender duas vezes
+        async with self._pair_lock(pair['symbol']):
+            # Par com posição aberta tem prioridade de saída no orçamento de peso
+            token = request_priority.set(self._priority(pair['symbol']))
+            try:
+                return await self._analyze_pair(pair, closed)
+            finally:
+                request_priority.reset(token)
+
+    def _priority(self, symbol):
+        return EXIT if symbol in self.active_trades else SCAN
+
+    async def _analyze_pair(self, pair, closed=False):
+        s = pair['symbol']
+        ohlcv = await self._fetch_pair(pair)
+        if ohlcv is None: return None
+        if closed and s not in self.active_trades:
+            # Entrada no fechamento (agendador): o último candle abriu há ~CANDLE_CLOSE_DELAY e está quase vazio.
+            # Decide pelo candle que acabou de fechar; saídas continuam no preço ao vivo
+            tf_ms = self.exchange.parse_timeframe(getattr(self.config, 'TIMEFRAME', '1m')) * 1000
+            if ohlcv[-1][0] + tf_ms > self.now() * 1000:
+                ohlcv = ohlcv[:-1]
+
+        try:
+            # --- 7 SMAs + RSI + BOLLINGER (incremental, O(1) por candle) ---
+            # Mesmos valores da última linha do cálculo Pandas (compute_frame), sem refazer 600 linhas
+            if s not in self.indicators:
+                self.indicators[s] = IncrementalIndicators(self.config.SMA_PERIODS)
+            with METRICS.timer('indicators', s):
+                last = self.indicators[s].sync(ohlcv)
+        except Exception:
+            return None
+        with METRICS.timer('decide', s):
+            return await self._decide(s, ohlcv, last)
+
+    async def _fetch_pair(self, pair):
+        """Filtro de volume + candles do par. None se o par deve ser ignorado neste ciclo"""
         # 1. Checa Limites Diários
         if not self._check_daily_limits(): return None 
         
         s = pair['symbol']
 
         # 2. --- NOVO: FILTRO DE VOLUME (Anti-Mico) ---
-        # Só gastamos tempo analisando se a moeda tiver liquidez
-        try:
-            ticker = await self.exchange.fetch_ticker(s)
-            quote_volume = ticker.get('quoteVolume', 0) # Volume em USDT
-            
-            if quote_volume < self.config.MIN_VOLUME_24H:
-                return None
-        except Exception:
-            return None # Se der erro no ticker, ignora e segue
+        # Só gastamos tempo analisando se a moeda tiver liquidez (ticker do snapshot em lote, sem request)
+        if not self._is_liquid(s):
+            return None # Sem ticker ou volume baixo: ignora e segue
 
         try:
-            # Baixa 600 candles para garantir o cálculo da SMA 500
+            # 600 candles no primeiro ciclo (SMA 500), depois só o delta desde o último candle
             timeframe = getattr(self.config, 'TIMEFRAME', '1m')
-            ohlcv = await self.exchange.fetch_ohlcv(s, timeframe, limit=self.config.LIMIT_CANDLES)
+            ohlcv = self.candles.get(s) if self._stream_live() else None
+            if not ohlcv:
+                token = request_priority.set(self._priority(s))
+                try:
+                    with METRICS.timer('ohlcv_fetch', s):
+                        ohlcv = await self.candles.fetch(s, timeframe)
+                finally:
+                    request_priority.reset(token)
             if not ohlcv or len(ohlcv) < 500: return None # Proteção se a moeda for muito nova e não tiver 500 candles
-            
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df.set_index(pd.to_datetime(df['timestamp'], unit='ms'), inplace=True)
-            
-            # --- CÁLCULO DAS 7 MÉDIAS MÓVEIS ---
-            for period in self.config.SMA_PERIODS:
-                df[f'sma_{period}'] = df['close'].rolling(window=period).mean()
-
-            # Outros indicadores (Calculados via Pandas para performance)
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-            
-            # Bollinger Bands (20, 2)
-            df['std'] = df['close'].rolling(20).std()
-            df['lower_bb'] = df['sma_20'] - (df['std'] * 2)
-            df['upper_bb'] = df['sma_20'] + (df['std'] * 2)
-            
-            # Pega os últimos valores
-            last = df.iloc[-1]
+            return ohlcv
+        except Exception:
+            return None
+
+    async def _decide(self, s, ohlcv, last):
+        """Saídas e entradas de um par a partir dos indicadores já calculados ('last')"""
+        try:
             price = last['close']
             rsi = last['rsi']
             lower_bb = last['lower_bb']
-            
+
             status = "NEUTRO"
-            now = time.time()
+            now = self.now() # Zombie, cooldowns e horário do trade andam no relógio do mercado
             
             # --- LÓGICA DE VENDA E GESTÃO (TRAILING STOP + ZOMBIE) ---
             if s in self.active_trades and self.active_trades[s].get('status') != 'Pendente':
@@ -123,7 +297,7 @@ class TradingEngine:
                         self._save_state()
                         self.update_queue.put(('log', f"🛡️ BREAK-EVEN ATIVADO: {s} (Trade protegido no 0x0)"))
                         if self.telegram:
-                            asyncio.create_task(self.telegram.send_notification(f"🛡️ **ESCUDO ATIVADO**\n\nBlindando trade em {s}!\nSe cair, saímos no 0x0."))
+                            self.telegram.notify(f"🛡️ **ESCUDO ATIVADO**\n\nBlindando trade em {s}!\nSe cair, saímos no 0x0.")
 
                 # 2. Executa o Stop (Dinâmico)
                 # Se estiver protegido (secured), o Stop é o preço de entrada (+0.1% para pagar taxas)
@@ -133,8 +307,8 @@ class TradingEngine:
                 if price <= stop_price:
                     reason = "BREAK_EVEN_EXIT" if is_secured else "STOP_LOSS"
                     # Pequeno filtro: Se for break-even, só sai se o lucro for realmente baixo/zero
-                    await self._sell(s, price, df, reason=reason)
-                    self.cooldown_list[s] = time.time() + 300
+                    await self._sell(s, price, ohlcv, reason=reason)
+                    self.cooldown_list[s] = self.now() + 300
                     return None
 
                 # --- A. LÓGICA DO TRAILING STOP ---
@@ -147,7 +321,7 @@ class TradingEngine:
                         self.update_queue.put(('log', f"🚀 TRAILING ATIVADO: {s} em {current_profit_pct*100:.2f}%"))
                         
                         if self.telegram:
-                            asyncio.create_task(self.telegram.send_notification(f"🚀 **TRAILING ATIVADO**\n\n💎 Par: `{s}`\n📈 Lucro Atual: *{current_profit_pct*100:.2f}%*\n👀 Acompanhando a alta..."))
+                            self.telegram.notify(f"🚀 **TRAILING ATIVADO**\n\n💎 Par: `{s}`\n📈 Lucro Atual: *{current_profit_pct*100:.2f}%*\n👀 Acompanhando a alta...")
 
                     # 2. Acompanhamento: Se já está ativo
                     elif highest_price > 0:
@@ -161,29 +335,29 @@ class TradingEngine:
                         pullback = (highest_price - price) / highest_price
                         if pullback >= self.config.TRAILING_CALLBACK:
                             self.update_queue.put(('log', f"💰 TRAILING STOP HIT: {s} (Topo: {highest_price})"))
-                            await self._sell(s, price, df, reason="TRAILING_PROFIT")
+                            await self._sell(s, price, ohlcv, reason="TRAILING_PROFIT")
                             self.cooldown_list[s] = now + 300
                             return None
 
                 # --- B. TAKE PROFIT FIXO (Fallback se Trailing desligado) ---
                 take_profit_target = getattr(self.config, 'TAKE_PROFIT', 0.025)
                 if not self.config.USE_TRAILING_STOP and current_profit_pct >= take_profit_target:
-                     await self._sell(s, price, df, reason="TAKE_PROFIT")
+                     await self._sell(s, price, ohlcv, reason="TAKE_PROFIT")
                      self.cooldown_list[s] = now + 300
                      return None
 
                 # --- C. ZOMBIE KILLER (Só mata se NÃO estiver no Trailing Lucrativo) ---
-                entry_time = trade.get('time', time.time())
+                entry_time = trade.get('time', now)
                 duration = now - entry_time
                 if highest_price == 0 and duration >= self.config.ZOMBIE_TIMEOUT:
                     self.update_queue.put(('log', f"🧟 ZOMBIE KILLER: Fechando {s} após {int(duration/3600)}h de tédio..."))
-                    await self._sell(s, price, df, reason="ZOMBIE")
+                    await self._sell(s, price, ohlcv, reason="ZOMBIE")
                     self.cooldown_list[s] = now + 600 # Cooldown maior para moedas zumbis
                     return None
             
             # --- LÓGICA DE COMPRA (STRATEGY: GOLDEN ARRAY) ---
             if self.running and s not in self.active_trades:
-                if len(self.active_trades) >= self.config.MAX_OPEN_TRADES: 
+                if self._slots_used() >= self.config.MAX_OPEN_TRADES: 
                     status = "NEUTRO (Saturado)"
                 elif s in self.cooldown_list and now < self.cooldown_list[s]:
                     remaining = int(self.cooldown_list[s] - now)
@@ -203,32 +377,53 @@ class TradingEngine:
                         status = "COMPRA FORTE"
                         self.update_queue.put(('log', f"🚀 SINAL FORTE em {s}: Acima da SMA500/200 + RSI {rsi:.1f}"))
                         self.active_trades[s] = {'entry': price, 'status': 'Pendente'} 
-                        await self._buy(s, price, df)
+                        reserved = await self._reserve_slot(s)
+                        if reserved:
+                            await self._buy(s, price, ohlcv)
+                        else:
+                            status = "NEUTRO (Saturado)"
+                        if self.active_trades.get(s, {}).get('status') == 'Pendente':
+                            # Reserva negada ou compra falhou: devolve o slot (compra que falhou pausa o par por 1 minuto)
+                            del self.active_trades[s]
+                            self._save_state()
+                            if reserved: self.cooldown_list[s] = self.now() + 60
             
-            return {'symbol': s, 'price': price, 'rsi': rsi, 'df': df, 'status': status, 'trade_info': self.active_trades.get(s)}
+            # Snapshot compacto: o histórico de candles/indicadores fica no CandleCache (chart_frame)
+            trade = self.active_trades.get(s)
+            return {'symbol': s, 'price': price, 'rsi': rsi, 'status': status, 'candle_ts': ohlcv[-1][0], 'trade_info': dict(trade) if trade else None}
         except Exception as e:
             # self.update_queue.put(('log', f"Erro em {s}: {e}"))
+            METRICS.count('swallowed', stage='decide', symbol=s, error=type(e).__name__)
             return None
 
-    async def _sell(self, symbol, price, df=None, reason="PROFIT"):
+    async def _sell(self, symbol, price, ohlcv=None, reason="PROFIT"):
+        signal_at = time.perf_counter()
         try:
             if symbol not in self.active_trades: return
 
+            await self.markets.ensure_loaded()
+            template = self.executor.template(symbol)
+            if not template or not template['active']:
+                self.update_queue.put(('log', f"⚠️ Mercado {symbol} está suspenso/fechado. Venda adiada."))
+                self.markets.request_refresh()
+                return False
+
             # --- 1. Lógica de Precisão e Venda na Binance ---
-            bal = await self.exchange.fetch_balance()
+            # Saldo do ledger local: só bloqueia para conciliar se houve erro (o periódico roda em segundo plano)
+            await self.ledger.ensure_ready()
             coin = symbol.split('/')[0]
-            actual_balance = float(bal.get(coin, {}).get('free', 0))
+            actual_balance = self.ledger.free(coin)
             qty_to_sell = min(float(self.active_trades[symbol]['qty']), actual_balance)
-            precise_qty = self.exchange.amount_to_precision(symbol, qty_to_sell)
+            precise_qty = self.markets.amount_to_precision(symbol, qty_to_sell)
 
             # Ajuste fino se arredondamento passar do saldo
             if float(precise_qty) > actual_balance:
-                market = self.exchange.market(symbol)
-                step_size = market['limits']['amount']['min']
-                precise_qty = self.exchange.amount_to_precision(symbol, actual_balance - step_size)
+                step_size = float(template['step'] or 0)
+                precise_qty = self.markets.amount_to_precision(symbol, actual_balance - step_size)
 
             self.update_queue.put(('log', f"🔻 VENDA ({reason}): {symbol} Qtd: {precise_qty}"))
-            order = await self.exchange.create_market_sell_order(symbol, precise_qty)
+            order = await self.executor.market_sell(symbol, precise_qty, signal_at)
+            self.ledger.apply_fill(symbol, 'sell', order, price, float(precise_qty))
             
             # --- 2. Cálculos Financeiros ---
             trade_data = self.active_trades[symbol]
@@ -239,29 +434,9 @@ class TradingEngine:
 
             self.update_queue.put(('log', f"✅ VENDA SUCESSO: {symbol} | Lucro: ${pnl:.2f} ({pnl_pct:.2f}%)"))
 
-            # --- 3. GRAVAÇÃO NO BANCO DE DADOS (A CORREÇÃO) ---
+            # --- 3. GRAVAÇÃO NO BANCO DE DADOS (executor dedicado, fora do event loop) ---
             try:
-                conn = sqlite3.connect('trades_history.db')
-                cursor = conn.cursor()
-                # Garante que a tabela existe
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS trades (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        symbol TEXT,
-                        side TEXT,
-                        price REAL,
-                        qty REAL,
-                        pnl REAL,
-                        timestamp TEXT
-                    )
-                """)
-                timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-                cursor.execute(
-                    "INSERT INTO trades (symbol, side, price, qty, pnl, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-                    (symbol, 'SELL', real_sell_price, float(precise_qty), pnl, timestamp)
-                )
-                conn.commit()
-                conn.close()
+                await self.history.record(symbol, 'SELL', real_sell_price, float(precise_qty), pnl)
             except Exception as e_db:
                 self.update_queue.put(('log', f"⚠️ Erro ao salvar histórico: {e_db}"))
 
@@ -273,125 +448,177 @@ class TradingEngine:
                        f"💎 Par: `{symbol}`\n"
                        f"💵 Venda: `${real_sell_price:.4f}`\n"
                        f"📈 Resultado: *${pnl:.2f}* ({pnl_pct:.2f}%)")
-                asyncio.create_task(self.telegram.send_notification(msg))
+                self.telegram.notify(msg)
                 
                 # NOVA LINHA: Gráfico de saída
                 pnl_label = f"${pnl:.2f}"
-                if df is not None:
-                    asyncio.create_task(self.telegram.send_chart(symbol, df, f"VENDA ({reason})", price, pnl_label))
+                if ohlcv:
+                    asyncio.create_task(self.telegram.send_chart(symbol, ohlcv, f"VENDA ({reason})", price, pnl_label))
 
         except Exception as e:
+            self.ledger.mark_dirty()
             error_msg = str(e).lower()
             if "insufficient balance" in error_msg:
                 self.update_queue.put(('log', f"⚠️ Saldo insuficiente para {symbol}. Limpando memória..."))
             else:
                 self.update_queue.put(('log', f"❌ ERRO VENDA {symbol}: {e}"))
+                if self.markets.is_market_error(e): self.markets.request_refresh()
                 return False
         
         # --- 5. Limpeza de Memória ---
         if symbol in self.active_trades:
             del self.active_trades[symbol]
-            self._save_state()
+            await self._commit_state()
         return True
 
-    async def _buy(self, symbol, price, df=None):
+    async def _buy(self, symbol, price, ohlcv=None):
         if not self.running: return
+        signal_at = time.perf_counter()
 
         try:
-            # FORÇAR RECARREGAMENTO DE MERCADOS (Resolve o erro de Market Closed)
-            await self.exchange.load_markets(True) 
-            
-            if symbol not in self.exchange.markets:
+            # Parâmetros do par pré-calculados (metadados recarregados em segundo plano)
+            await self.markets.ensure_loaded()
+            market = self.executor.template(symbol)
+
+            if market is None:
                 self.update_queue.put(('log', f"⚠️ {symbol} não encontrado na Binance."))
                 return
 
-            market = self.exchange.market(symbol)
-            
             # Verificar se o par está ativo e permite ordens a mercado
-            if not market.get('active', False):
+            if not market['active']:
                 self.update_queue.put(('log', f"⚠️ Mercado {symbol} está suspenso/fechado."))
                 return
 
             # Cálculo de quantidade com precisão rigorosa
-            amount_usdt = self.config.TRADE_AMOUNT
-            amount = self.exchange.amount_to_precision(symbol, amount_usdt / price)
-            
-            self.update_queue.put(('log', f"🛒 Enviando ordem real para {symbol}..."))
+            amount = self.executor.buy_amount(symbol, self.config.TRADE_AMOUNT, price)
+            if amount is None:
+                self.update_queue.put(('log', f"⚠️ {symbol}: ordem abaixo do mínimo da Binance (${market['min_notional']:.2f})."))
+                return
             
-            # Envio com sincronização de tempo (recvWindow)
-            order = await self.exchange.create_market_buy_order(symbol, amount, {'recvWindow': 60000})
+            # Timestamp corrigido pelo offset medido no OrderExecutor (recvWindow padrão)
+            order = await self.executor.market_buy(symbol, amount, signal_at)
+            self.update_queue.put(('log', f"🛒 Ordem enviada para {symbol} ({(time.perf_counter() - signal_at) * 1000:.0f}ms até o ack)"))
+            self.ledger.apply_fill(symbol, 'buy', order, price, float(amount))
             
             real_price = float(order.get('average', price))
             self.active_trades[symbol] = {
                 'entry': real_price, 
                 'qty': float(amount), 
                 'sl': real_price * 0.96,
-                'time': time.time()
+                'time': self.now()
             }
-            self._save_state()
+            await self._commit_state()
             self.update_queue.put(('log', f"🚀 COMPRA SUCESSO: {symbol} @ {real_price}"))
             
             msg = f"🟢 **COMPRA EXECUTADA**\n\n💎 Par: `{symbol}`\n💵 Preço: `${real_price:.4f}`\n🚀 Slots: {len(self.active_trades)}/2"
             if self.telegram:
-                asyncio.create_task(self.telegram.send_notification(msg))
+                self.telegram.notify(msg)
                 # NOVA LINHA: Envia o gráfico se o DF existir
-                if df is not None:
-                    asyncio.create_task(self.telegram.send_chart(symbol, df, "COMPRA", price))
+                if ohlcv:
+                    asyncio.create_task(self.telegram.send_chart(symbol, ohlcv, "COMPRA", price))
             
         except Exception as e:
             # Se der erro de mercado fechado aqui, o bot pausa o par por 1 minuto
+            self.ledger.mark_dirty()
             self.update_queue.put(('log', f"❌ ERRO API: {e}"))
+            if self.markets.is_market_error(e):
+                self.markets.request_refresh()
             if "closed" in str(e).lower():
                 self.update_queue.put(('log', "💡 Dica: Verifique se BINANCE_SANDBOX_MODE está FALSE no .env"))
 
     async def trading_cycle(self):
         try:
+            await self.refresh_universe()
+
             # 1. Verificação de segurança ANTES de começar o ciclo
-            if len(self.active_trades) >= self.config.MAX_OPEN_TRADES:
+            if self._slots_used() >= self.config.MAX_OPEN_TRADES:
                 # Se já atingiu o limite, apenas atualiza preços e PnL, não busca novas compras
                 self.update_queue.put(('log', f"✅ Limite de slots atingido ({self.config.MAX_OPEN_TRADES}/{self.config.MAX_OPEN_TRADES}). Monitorando saídas..."))
                 # Reduzimos a carga processando apenas o que já está comprado
-                tasks = [self._process_pair(p) for p in self.config.PAIRS if p['symbol'] in self.active_trades]
+                pairs = [p for p in self.pairs if p['symbol'] in self.active_trades]
             else:
-                tasks = [self._process_pair(p) for p in self.config.PAIRS]
+                pairs = self.pairs
+
+            # 2. Um único fetch_tickers (cache de TICKER_TTL) e já descarta quem não tem liquidez
+            await self.tickers.refresh([p['symbol'] for p in self.pairs])
+            pairs = [p for p in pairs if self._is_liquid(p['symbol'])]
 
-            results = await asyncio.gather(*tasks)
+            if self.config.INDICATOR_MODE == 'BATCH':
+                results = await self._batch_cycle(pairs)
+            else:
+                results = await asyncio.gather(*[self._process_pair(p) for p in pairs])
             valid = [r for r in results if r]
             if valid:
-                bal = await self.exchange.fetch_balance()
-                self.portfolio['available_capital'] = float(bal.get('USDT', {}).get('free', 0))
-                
-                f_pnl = 0.0
-                for r in valid:
-                    if r['symbol'] in self.active_trades and 'qty' in self.active_trades[r['symbol']]:
-                        f_pnl += (r['price'] - self.active_trades[r['symbol']]['entry']) * self.active_trades[r['symbol']]['qty']
-
-                self.portfolio['floating_pnl'] = f_pnl
-                self.update_queue.put(('portfolio', self.portfolio))
-                self.update_queue.put(('pairs_data', valid))
-                
-                conn = sqlite3.connect('trades_history.db')
-                hist = conn.execute("SELECT symbol, pnl FROM trades WHERE side='SELL' ORDER BY id DESC LIMIT 10").fetchall()
-                conn.close()
-                self.update_queue.put(('trade_history', hist))
+                await self.publish(valid)
         except Exception as e:
+            METRICS.count('swallowed', stage='cycle', error=type(e).__name__)
             self.update_queue.put(('log', f"Erro Ciclo: {e}"))
 
+    async def publish(self, valid):
+        """Saldo, PnL aberto, snapshots dos pares e histórico para a GUI/servidor"""
+        # Concilia com a Binance só a cada BALANCE_RECONCILE_INTERVAL (ou após erro)
+        try:
+            await self.ledger.ensure_fresh()
+        except BudgetExceeded:
+            METRICS.count('dropped', stage='balance')
+            pass # Orçamento apertado: mostra o saldo local e concilia no próximo ciclo
+        self.portfolio['available_capital'] = self.ledger.free('USDT')
+
+        f_pnl = 0.0
+        for r in valid:
+            if r['symbol'] in self.active_trades and 'qty' in self.active_trades[r['symbol']]:
+                f_pnl += (r['price'] - self.active_trades[r['symbol']]['entry']) * self.active_trades[r['symbol']]['qty']
+
+        self.portfolio['floating_pnl'] = f_pnl
+        self.update_queue.put(('portfolio', dict(self.portfolio)))
+        self.update_queue.put(('pairs_data', valid))
+
+        # Histórico vem dos agregados em memória e só é reenviado quando houve trade novo
+        if self.history.stats.version != self.history_version:
+            self.history_version = self.history.stats.version
+            self.update_queue.put(('trade_history', self.history.stats.recent_sells(10)))
+
+    async def _batch_cycle(self, pairs):
+        """Baixa todos os pares e calcula os indicadores do universo inteiro numa passada NumPy"""
+        fetched = await asyncio.gather(*[self._fetch_pair(p) for p in pairs])
+        ready = [(p['symbol'], ohlcv) for p, ohlcv in zip(pairs, fetched) if ohlcv]
+        if not ready: return []
+
+        width = max(self.config.SMA_PERIODS + [20, 15])
+        with METRICS.timer('indicators_batch'):
+            batch = compute_batch(stack_closes([ohlcv for _, ohlcv in ready], width), self.config.SMA_PERIODS)
+
+        # Decisões em paralelo (como no _process_pair): uma ordem lenta num par não atrasa os outros
+        return await asyncio.gather(*[self._decide_locked(s, ohlcv, batch_row(batch, i)) for i, (s, ohlcv) in enumerate(ready)])
+
+    async def _decide_locked(self, s, ohlcv, last):
+        async with self._pair_lock(s):
+            token = request_priority.set(self._priority(s))
+            try:
+                return await self._decide(s, ohlcv, last)
+            finally:
+                request_priority.reset(token)
+
     async def emergency_close_all(self):
         self.running = False
         self.update_queue.put(('log', "🚨 PÂNICO FORCE v41.1..."))
+        request_priority.set(ORDER) # Pânico fura a fila do orçamento de peso
         try:
-            await self.exchange.load_markets()
-            bal = await self.exchange.fetch_balance()
+            await self.markets.ensure_loaded()
+            # No pânico vale o saldo real da Binance: força a conciliação do ledger
+            await self.ledger.reconcile()
             for s in list(self.active_trades.keys()):
                 coin = s.split('/')[0]
-                qty = float(bal.get(coin, {}).get('free', 0))
-                if qty > 0:
+                qty = self.ledger.free(coin)
+                if qty > 0 and not self.markets.is_active(s):
+                    self.update_queue.put(('log', f"⚠️ {s} suspenso na Binance, não dá para zerar agora."))
+                elif qty > 0:
                     ticker = await self.exchange.fetch_ticker(s)
                     if (qty * ticker['last']) > 11.0:
-                        precise_qty = self.exchange.amount_to_precision(s, qty)
-                        await self.exchange.create_market_sell_order(s, precise_qty)
+                        precise_qty = self.markets.amount_to_precision(s, qty)
+                        order = await self.exchange.create_market_sell_order(s, precise_qty)
+                        self.ledger.apply_fill(s, 'sell', order, ticker['last'], float(precise_qty))
                         self.update_queue.put(('log', f"✅ {s} zerado."))
-            self.active_trades = {}; self._save_state()
+            self.active_trades = {}; await self._commit_state()
             self.update_queue.put(('log', "🏁 PÂNICO CONCLUÍDO."))
         except Exception as e: self.update_queue.put(('log', f"❌ ERRO PÂNICO: {e}"))
\ No newline at end of file
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import deque
+from decimal import Decimal, ROUND_DOWN
+from core.metrics import METRICS
+from core.rate_limit import request_priority, EXIT
+
+
+class OrderExecutor:
+    """
+    Caminho rápido das ordens a mercado.
+    - Parâmetros por par (step, mínimos, ativo) pré-calculados a partir do MarketMetadata.
+    - Conexão HTTP mantida quente com GET /time periódico, que também mede o offset do relógio da Binance:
+      o timestamp assinado já sai corrigido e o recvWindow volta ao padrão (nada de 60000).
+    - Mede o tempo do sinal até a confirmação da ordem (signal_to_ack).
+    """
+
+    def __init__(self, exchange, markets, config):
+        self.exchange = exchange
+        self.markets = markets
+        self.config = config
+        self.recv_window = getattr(config, 'ORDER_RECV_WINDOW', 5000)
+        self.keepalive = getattr(config, 'ORDER_KEEPALIVE_INTERVAL', 10)
+        self.templates = {}          # symbol -> (loaded_at do MarketMetadata, parâmetros)
+        self.offset_ms = 0.0         # relógio da Binance - relógio local
+        self.rtt_ms = None
+        self.synced_at = 0.0
+        self.latencies = deque(maxlen=200)   # ms do sinal até o ack, últimas ordens
+        self.task = None
+
+    # --- PARÂMETROS PRÉ-CALCULADOS ---
+    def template(self, symbol):
+        cached = self.templates.get(symbol)
+        if cached and cached[0] == self.markets.loaded_at:
+            return cached[1]
+        info = self.markets.get(symbol)
+        if info is None:
+            return None
+        params = {
+            'active': info['active'],
+            'step': info['step'],
+            'min_qty': info['min_qty'],
+            'min_notional': info['min_notional'],
+            'base': symbol.split('/')[0],
+        }
+        self.templates[symbol] = (self.markets.loaded_at, params)
+        return params
+
+    def buy_amount(self, symbol, quote_amount, price):
+        """Quantidade (string no step) para gastar 'quote_amount' ao preço; None se abaixo dos mínimos"""
+        t = self.template(symbol)
+        if t is None or t['step'] is None:
+            return self.markets.amount_to_precision(symbol, quote_amount / price)
+        qty = (Decimal(str(quote_amount / price)) / t['step']).to_integral_value(rounding=ROUND_DOWN) * t['step']
+        if float(qty) < t['min_qty'] or float(qty) * price < t['min_notional']:
+            return None
+        return format(qty.normalize(), 'f')
+
+    # --- RELÓGIO E CONEXÃO ---
+    async def start(self):
+        if self.task is None or self.task.done():
+            await self.sync_clock()
+            self.task = asyncio.create_task(self._keepalive_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def sync_clock(self):
+        """GET /time (peso 1): mede o offset e o RTT e ajusta o timestamp das requisições assinadas"""
+        token = request_priority.set(EXIT)
+        try:
+            t0 = time.time() * 1000
+            server = await self.exchange.fetch_time()
+            t1 = time.time() * 1000
+        except Exception as e:
+            METRICS.count('errors', stage='clock_sync', error=type(e).__name__)
+            return False
+        finally:
+            request_priority.reset(token)
+
+        self.rtt_ms = t1 - t0
+        self.offset_ms = server - (t0 + t1) / 2
+        self.synced_at = time.time()
+        options = getattr(self.exchange, 'options', None)
+        if isinstance(options, dict):
+            # ccxt (binance): nonce = agora - timeDifference
+            options['timeDifference'] = int(round(-self.offset_ms))
+        METRICS.observe('clock_sync', self.rtt_ms / 1000)
+        return True
+
+    async def _keepalive_loop(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            await self.sync_clock()
+
+    # --- ORDENS ---
+    async def market_buy(self, symbol, amount, signal_at=None):
+        return await self._submit('buy', symbol, amount, signal_at)
+
+    async def market_sell(self, symbol, amount, signal_at=None):
+        return await self._submit('sell', symbol, amount, signal_at)
+
+    async def _submit(self, side, symbol, amount, signal_at):
+        signal_at = signal_at or time.perf_counter()
+        send = self.exchange.create_market_buy_order if side == 'buy' else self.exchange.create_market_sell_order
+        params = {'recvWindow': self.recv_window}
+        try:
+            with METRICS.timer(f'order_{side}', symbol):
+                order = await send(symbol, amount, params)
+        except Exception as e:
+            # -1021: relógio fora da janela -> ressincroniza e tenta uma vez
+            if '-1021' not in str(e) or not await self.sync_clock():
+                raise
+            with METRICS.timer(f'order_{side}', symbol):
+                order = await send(symbol, amount, params)
+
+        elapsed = time.perf_counter() - signal_at
+        METRICS.observe('signal_to_ack', elapsed, symbol)
+        self.latencies.append(elapsed * 1000)
+        return order
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        return {
+            'orders': len(lat),
+            'signal_to_ack_p50_ms': lat[len(lat) // 2] if lat else None,
+            'signal_to_ack_max_ms': lat[-1] if lat else None,
+            'clock_offset_ms': self.offset_ms,
+            'rtt_ms': self.rtt_ms,
+        }
@@ -0,0 +1,129 @@
+import asyncio
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from core.metrics import METRICS
+
+
+class TradeStats:
+    """Agregados de PnL em memória (total, por dia, por par) + últimos trades. Leitura em O(1)"""
+
+    def __init__(self, recent_size=50):
+        self.count = 0
+        self.pnl = 0.0
+        self.by_day = {}        # 'YYYY-MM-DD' -> [vendas, pnl]
+        self.by_symbol = {}     # symbol -> [vendas, pnl]
+        self.recent_exits = deque(maxlen=recent_size)    # (symbol, pnl), mais recente primeiro
+        self.recent_trades = deque(maxlen=recent_size)   # (symbol, side, price, pnl, timestamp)
+        self.version = 0        # Muda a cada trade: consumidores só redesenham quando mudar
+
+    def add(self, symbol, side, price, pnl, timestamp):
+        self.recent_trades.appendleft((symbol, side, price, pnl, timestamp))
+        if side == 'SELL':
+            pnl = pnl or 0.0
+            self.count += 1
+            self.pnl += pnl
+            for key, table in ((timestamp[:10], self.by_day), (symbol, self.by_symbol)):
+                row = table.setdefault(key, [0, 0.0])
+                row[0] += 1
+                row[1] += pnl
+            self.recent_exits.appendleft((symbol, pnl))
+        self.version += 1
+
+    def summary(self, day=None):
+        """(quantidade, soma do PnL) das vendas; 'day' = 'YYYY-MM-DD' limita a um dia"""
+        if day is None:
+            return self.count, self.pnl
+        count, pnl = self.by_day.get(day, (0, 0.0))
+        return count, pnl
+
+    def symbol_summary(self, symbol):
+        count, pnl = self.by_symbol.get(symbol, (0, 0.0))
+        return count, pnl
+
+    def top_symbols(self, limit=5):
+        """[(symbol, vendas, pnl)] dos pares com mais PnL acumulado"""
+        rows = sorted(self.by_symbol.items(), key=lambda kv: kv[1][1], reverse=True)[:limit]
+        return [(symbol, count, pnl) for symbol, (count, pnl) in rows]
+
+    def recent_sells(self, limit=10):
+        return list(self.recent_exits)[:limit]
+
+    def last_trades(self, limit=5):
+        return list(self.recent_trades)[:limit]
+
+    def load(self, conn):
+        """Reconstrói tudo a partir do banco (uma vez, na inicialização)"""
+        self.__init__(self.recent_exits.maxlen)
+        self.count, self.pnl = conn.execute("SELECT COUNT(*), COALESCE(SUM(pnl), 0) FROM trades WHERE side='SELL'").fetchone()
+        for day, count, pnl in conn.execute(
+                "SELECT substr(timestamp, 1, 10), COUNT(*), COALESCE(SUM(pnl), 0) FROM trades WHERE side='SELL' GROUP BY 1"):
+            self.by_day[day] = [count, pnl]
+        for symbol, count, pnl in conn.execute(
+                "SELECT symbol, COUNT(*), COALESCE(SUM(pnl), 0) FROM trades WHERE side='SELL' GROUP BY symbol"):
+            self.by_symbol[symbol] = [count, pnl]
+        size = self.recent_trades.maxlen
+        self.recent_exits.extend(conn.execute(
+            "SELECT symbol, COALESCE(pnl, 0) FROM trades WHERE side='SELL' ORDER BY id DESC LIMIT ?", (size,)))
+        self.recent_trades.extend(conn.execute(
+            "SELECT symbol, side, price, pnl, timestamp FROM trades ORDER BY id DESC LIMIT ?", (size,)))
+
+
+class TradeHistory:
+    """
+    Repositório do trades_history.db.
+    Uma única conexão (modo WAL) usada só pela thread do executor: nada de SQLite dentro do event loop.
+    """
+
+    def __init__(self, path='trades_history.db'):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trade-history")
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._init_schema()
+        self.stats = TradeStats()
+        self.stats.load(self.conn)
+
+    def _init_schema(self):
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT,
+                side TEXT,
+                price REAL,
+                qty REAL,
+                pnl REAL,
+                timestamp TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_side ON trades(side, timestamp)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol)")
+        self.conn.commit()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    # --- ESCRITA ---
+    async def record(self, symbol, side, price, qty, pnl=None, timestamp=None):
+        timestamp = timestamp or time.strftime('%Y-%m-%d %H:%M:%S')
+        row_id = await self._run(self._insert, symbol, side, price, qty, pnl, timestamp)
+        # Agregados só depois do INSERT: um trade que não foi gravado não aparece no /status
+        self.stats.add(symbol, side, price, pnl, timestamp)
+        return row_id
+
+    def _insert(self, symbol, side, price, qty, pnl, timestamp):
+        with METRICS.timer('db_write', symbol):
+            cur = self.conn.execute(
+                "INSERT INTO trades (symbol, side, price, qty, pnl, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                (symbol, side, price, qty, pnl, timestamp)
+            )
+            self.conn.commit()
+        return cur.lastrowid
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.conn.close()
@@ -0,0 +1,260 @@
+import math
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+
+def compute_frame(ohlcv, config):
+    """DataFrame completo com SMAs, RSI e Bollinger (usado para gráficos e como referência)"""
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df.set_index(pd.to_datetime(df['timestamp'], unit='ms'), inplace=True)
+
+    # --- CÁLCULO DAS 7 MÉDIAS MÓVEIS ---
+    for period in config.SMA_PERIODS:
+        df[f'sma_{period}'] = df['close'].rolling(window=period).mean()
+
+    # RSI 14
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    df['rsi'] = 100 - (100 / (1 + rs))
+
+    # Bollinger Bands (20, 2)
+    sma_20 = df['sma_20'] if 'sma_20' in df.columns else df['close'].rolling(20).mean()
+    df['std'] = df['close'].rolling(20).std()
+    df['lower_bb'] = sma_20 - (df['std'] * 2)
+    df['upper_bb'] = sma_20 + (df['std'] * 2)
+    return df
+
+
+def stack_closes(candle_lists, width):
+    """Matriz (pares x width) com os últimos closes de cada par; pares curtos ficam com NaN à esquerda"""
+    closes = np.full((len(candle_lists), width), np.nan)
+    for i, candles in enumerate(candle_lists):
+        tail = candles[-width:]
+        if tail:
+            closes[i, width - len(tail):] = [c[4] for c in tail]
+    return closes
+
+
+def compute_batch(closes, sma_periods, rsi_period=14, bb_period=20, bb_dev=2):
+    """
+    SMAs, RSI e Bollinger de todos os pares numa única passada vetorizada.
+    Cada array tem um valor por linha da matriz (igual à última linha de compute_frame).
+    """
+    out = {'close': closes[:, -1]}
+    for p in sma_periods:
+        out[f'sma_{p}'] = closes[:, -p:].mean(axis=1)
+
+    # RSI: o Pandas trata o delta NaN como 0, então só exige 14 closes válidos
+    valid = np.count_nonzero(~np.isnan(closes[:, -(rsi_period + 1):]), axis=1)
+    delta = np.diff(closes[:, -(rsi_period + 1):], axis=1)
+    gain = np.where(delta > 0, delta, 0).mean(axis=1)
+    loss = np.where(delta < 0, -delta, 0).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
+    out['rsi'] = np.where(valid >= rsi_period, rsi, np.nan)
+
+    # Desvio em relação ao primeiro close da janela (precisão e std exata 0 em janelas planas)
+    window = closes[:, -bb_period:]
+    shifted = window - window[:, :1]
+    std = shifted.std(axis=1, ddof=1)
+    mid = shifted.mean(axis=1) + window[:, 0]
+    out['std'] = std
+    out['lower_bb'] = mid - std * bb_dev
+    out['upper_bb'] = mid + std * bb_dev
+    return out
+
+
+def batch_row(batch, i):
+    """Valores de um par (linha i) no mesmo formato de IncrementalIndicators.values()"""
+    return {k: float(v[i]) for k, v in batch.items()}
+
+
+class IncrementalIndicators:
+    """
+    Estado incremental de um par: SMAs, RSI 14 e Bollinger (20, 2) em O(1) por candle.
+    Reproduz os valores da última linha de compute_frame (médias simples do Pandas).
+    """
+
+    RSI_PERIOD = 14
+    BB_PERIOD = 20
+    BB_DEV = 2
+
+    def __init__(self, sma_periods):
+        self.sma_periods = list(sma_periods)
+        self.capacity = max(self.sma_periods + [self.BB_PERIOD, self.RSI_PERIOD + 1]) + 1
+        self.reset()
+
+    def reset(self):
+        self.buf = [0.0] * self.capacity
+        self.n = 0                  # Total de closes já vistos
+        self.last_ts = None
+        self.sums = {p: 0.0 for p in self.sma_periods}
+        self.gain_sum = self.loss_sum = 0.0
+        self.gain_count = self.loss_count = 0
+        self.bb_sum = self.bb_sq = 0.0
+        self.ref = 0.0              # Deslocamento para a variância não perder precisão
+        self.run = self.run_prev = 0   # Closes iguais consecutivos (std exata = 0)
+        self.mutations = 0
+
+    def _close(self, i):
+        return self.buf[i % self.capacity]
+
+    # --- ATUALIZAÇÕES ---
+    def sync(self, candles):
+        """Alinha o estado com a lista de candles do cache e devolve os valores atuais"""
+        if not candles:
+            self.reset()
+            return self.values()
+
+        last_ts = candles[-1][0]
+        if self.last_ts is None or last_ts < self.last_ts:
+            return self._rebuild(candles)
+
+        if last_ts == self.last_ts:
+            self.update_last(candles[-1][4])
+            return self.values()
+
+        i = len(candles) - 1
+        while i >= 0 and candles[i][0] > self.last_ts:
+            i -= 1
+        if i < 0 or candles[i][0] != self.last_ts:
+            return self._rebuild(candles)
+
+        self.update_last(candles[i][4])   # O candle que estava em formação fechou
+        for c in candles[i + 1:]:
+            self.append(c[0], c[4])
+        return self.values()
+
+    def _rebuild(self, candles):
+        self.reset()
+        for c in candles[-self.capacity:]:
+            self.append(c[0], c[4])
+        return self.values()
+
+    def append(self, ts, close):
+        close = float(close)
+        n = self.n
+        if n == 0:
+            self.ref = close
+
+        for p in self.sma_periods:
+            self.sums[p] += close
+            if n >= p:
+                self.sums[p] -= self._close(n - p)
+
+        x = close - self.ref
+        self.bb_sum += x
+        self.bb_sq += x * x
+        if n >= self.BB_PERIOD:
+            old = self._close(n - self.BB_PERIOD) - self.ref
+            self.bb_sum -= old
+            self.bb_sq -= old * old
+
+        if n >= 1:
+            self._add_delta(close - self._close(n - 1), 1)
+            # Delta que sai da janela: c[n-14] - c[n-15]
+            if n - 1 >= self.RSI_PERIOD:
+                self._add_delta(self._close(n - self.RSI_PERIOD) - self._close(n - self.RSI_PERIOD - 1), -1)
+
+        self.run_prev = self.run
+        self.run = self.run + 1 if n >= 1 and close == self._close(n - 1) else 1
+
+        self.buf[n % self.capacity] = close
+        self.n = n + 1
+        self.last_ts = ts
+        self._after_mutation()
+
+    def update_last(self, close):
+        """O candle em formação mudou de preço"""
+        if self.n == 0:
+            return
+        close = float(close)
+        n = self.n
+        old = self._close(n - 1)
+        if close == old:
+            return
+
+        diff = close - old
+        for p in self.sma_periods:
+            self.sums[p] += diff
+
+        xo, xn = old - self.ref, close - self.ref
+        self.bb_sum += xn - xo
+        self.bb_sq += xn * xn - xo * xo
+
+        if n >= 2:
+            prev = self._close(n - 2)
+            self._add_delta(old - prev, -1)
+            self._add_delta(close - prev, 1)
+            self.run = self.run_prev + 1 if close == prev else 1
+        else:
+            self.run = 1
+
+        self.buf[(n - 1) % self.capacity] = close
+        self._after_mutation()
+
+    def _add_delta(self, d, sign):
+        if d > 0:
+            self.gain_sum += sign * d
+            self.gain_count += sign
+        elif d < 0:
+            self.loss_sum -= sign * d
+            self.loss_count += sign
+
+    def _after_mutation(self):
+        # Somas corridas acumulam erro de arredondamento: recalcula tudo a cada volta do buffer (O(1) amortizado)
+        self.mutations += 1
+        if self.mutations >= self.capacity:
+            self._recompute()
+
+    def _recompute(self):
+        self.mutations = 0
+        n = self.n
+        for p in self.sma_periods:
+            self.sums[p] = math.fsum(self._close(i) for i in range(max(0, n - p), n))
+
+        start = max(0, n - self.BB_PERIOD)
+        self.ref = self._close(start) if n else 0.0
+        window = [self._close(i) - self.ref for i in range(start, n)]
+        self.bb_sum = math.fsum(window)
+        self.bb_sq = math.fsum(x * x for x in window)
+
+        self.gain_sum = self.loss_sum = 0.0
+        self.gain_count = self.loss_count = 0
+        for i in range(max(1, n - self.RSI_PERIOD), n):
+            self._add_delta(self._close(i) - self._close(i - 1), 1)
+
+    # --- LEITURA ---
+    def values(self):
+        n = self.n
+        out = {'timestamp': self.last_ts, 'close': self._close(n - 1) if n else NAN}
+        for p in self.sma_periods:
+            out[f'sma_{p}'] = self.sums[p] / p if n >= p else NAN
+
+        out['rsi'] = NAN
+        # O Pandas troca o primeiro delta (NaN) por 0, então o RSI já sai com 14 closes
+        if n >= self.RSI_PERIOD:
+            gain = 0.0 if self.gain_count == 0 else self.gain_sum / self.RSI_PERIOD
+            loss = 0.0 if self.loss_count == 0 else self.loss_sum / self.RSI_PERIOD
+            if loss > 0:
+                out['rsi'] = 100 - (100 / (1 + gain / loss))
+            elif gain > 0:
+                out['rsi'] = 100.0
+
+        out['std'] = out['lower_bb'] = out['upper_bb'] = NAN
+        if n >= self.BB_PERIOD:
+            k = self.BB_PERIOD
+            if self.run >= k:
+                std = 0.0
+            else:
+                var = (self.bb_sq - self.bb_sum * self.bb_sum / k) / (k - 1)
+                std = math.sqrt(var) if var > 0 else 0.0
+            mid = self.bb_sum / k + self.ref
+            out['std'] = std
+            out['lower_bb'] = mid - std * self.BB_DEV
+            out['upper_bb'] = mid + std * self.BB_DEV
+        return out
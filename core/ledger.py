@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+
+class BalanceLedger:
+    """
+    Saldo local (free) por moeda, atualizado pelas nossas próprias execuções.
+    Só consulta a Binance (fetch_balance) a cada BALANCE_RECONCILE_INTERVAL ou depois de um erro.
+    """
+
+    def __init__(self, exchange, config):
+        self.exchange = exchange
+        self.config = config
+        self.balances = {}
+        self.reconciled_at = 0.0
+        self.dirty = True
+        self.lock = asyncio.Lock()
+        self.fills = 0          # Execuções aplicadas (conciliação que cruzou uma execução é descartada)
+
+    def free(self, asset):
+        return self.balances.get(asset, 0.0)
+
+    def is_stale(self):
+        interval = getattr(self.config, 'BALANCE_RECONCILE_INTERVAL', 300)
+        return self.dirty or (time.time() - self.reconciled_at) >= interval
+
+    def mark_dirty(self):
+        """Algo deu errado (saldo insuficiente, ordem rejeitada): concilia antes da próxima leitura"""
+        self.dirty = True
+
+    async def ensure_fresh(self):
+        if self.is_stale():
+            await self.reconcile()
+
+    async def ensure_ready(self):
+        """Caminho da ordem: só espera a Binance se o saldo local não é confiável (erro); senão concilia em segundo plano"""
+        if self.dirty:
+            await self.reconcile()
+        elif self.is_stale() and not self.lock.locked():
+            asyncio.create_task(self._background_reconcile())
+
+    async def _background_reconcile(self):
+        try:
+            await self.reconcile()
+        except Exception as e:
+            print(f"⚠️ Erro ao conciliar saldo: {e}")
+
+    async def reconcile(self):
+        async with self.lock:
+            fills = self.fills
+            bal = await self.exchange.fetch_balance()
+            if fills != self.fills and not self.dirty:
+                return self.balances   # Uma ordem executou durante o fetch: o saldo local é mais novo
+            self.balances = {asset: float(amount or 0) for asset, amount in (bal.get('free') or {}).items()}
+            self.reconciled_at = time.time()
+            self.dirty = False
+        return self.balances
+
+    def apply_fill(self, symbol, side, order, price, qty):
+        """Aplica uma ordem executada: base/quote pelo volume preenchido e taxas na moeda cobrada"""
+        self.fills += 1
+        base, quote = symbol.split('/')
+        filled = float(order.get('filled') or qty)
+        cost = float(order.get('cost') or filled * float(order.get('average') or price))
+
+        if side == 'buy':
+            self._add(base, filled)
+            self._add(quote, -cost)
+        else:
+            self._add(base, -filled)
+            self._add(quote, cost)
+
+        fees = order.get('fees') or ([order['fee']] if order.get('fee') else [])
+        for fee in fees:
+            if fee and fee.get('currency') and fee.get('cost'):
+                self._add(fee['currency'], -float(fee['cost']))
+
+    def _add(self, asset, amount):
+        self.balances[asset] = max(0.0, self.balances.get(asset, 0.0) + amount)
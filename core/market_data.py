@@ -0,0 +1,136 @@
+import asyncio
+import time
+from core.indicators import compute_frame
+from core.metrics import METRICS
+
+
+class CandleCache:
+    """Cache de candles por par: baixa o histórico uma vez e depois só busca o delta"""
+
+    def __init__(self, exchange, config):
+        self.exchange = exchange
+        self.config = config
+        self.candles = {}   # symbol -> lista de [timestamp, open, high, low, close, volume]
+        self.locks = {}
+        self.frames = {}    # symbol -> (chave do último candle, DataFrame) para gráficos
+
+    def _lock(self, symbol):
+        if symbol not in self.locks:
+            self.locks[symbol] = asyncio.Lock()
+        return self.locks[symbol]
+
+    def get(self, symbol):
+        return self.candles.get(symbol)
+
+    def evict(self, symbol):
+        self.candles.pop(symbol, None)
+        self.locks.pop(symbol, None)
+        self.frames.pop(symbol, None)
+
+    async def frame(self, symbol, config):
+        """DataFrame com indicadores, refeito só quando o último candle mudou (Pandas numa thread, fora do loop)"""
+        rows = list(self.candles.get(symbol) or [])   # Cópia no loop: o trading continua atualizando a lista
+        if not rows:
+            return None
+        key = (len(rows), rows[-1][0], rows[-1][4])
+        cached = self.frames.get(symbol)
+        if cached and cached[0] == key:
+            return cached[1]
+        df = await asyncio.get_running_loop().run_in_executor(None, compute_frame, rows, config)
+        if symbol in self.candles:   # Par evictado durante o cálculo não volta para o cache
+            self.frames[symbol] = (key, df)
+        return df
+
+    async def fetch(self, symbol, timeframe):
+        # Um lock por par evita dois downloads completos simultâneos do mesmo símbolo
+        async with self._lock(symbol):
+            cached = self.candles.get(symbol)
+            if not cached:
+                return await self._seed(symbol, timeframe)
+
+            delta_limit = getattr(self.config, 'CANDLE_DELTA_LIMIT', 10)
+            last_ts = cached[-1][0]
+            # O 'since' inclui o último candle (ainda em formação), que vem atualizado
+            delta = await self.exchange.fetch_ohlcv(symbol, timeframe, since=last_ts, limit=delta_limit)
+
+            # Buraco maior que o delta (ex: conexão caiu) -> baixa tudo de novo
+            if not delta or delta[0][0] > last_ts or len(delta) >= delta_limit:
+                return await self._seed(symbol, timeframe)
+
+            self.merge(symbol, delta)
+            return self.candles[symbol]
+
+    async def _seed(self, symbol, timeframe):
+        ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=self.config.LIMIT_CANDLES)
+        self.candles[symbol] = [list(c) for c in ohlcv] if ohlcv else []
+        return self.candles[symbol]
+
+    def apply_kline(self, symbol, candle, timeframe_ms):
+        """Aplica um candle vindo do stream. Retorna False se o par precisar de novo download"""
+        cached = self.candles.get(symbol)
+        if not cached:
+            return False
+        # Pulou candles (stream caiu e voltou) -> descarta para o REST baixar tudo de novo
+        if candle[0] > cached[-1][0] + timeframe_ms:
+            self.evict(symbol)
+            return False
+        if candle[0] < cached[-1][0]:
+            return True
+        self.merge(symbol, [candle])
+        return True
+
+    def merge(self, symbol, delta):
+        """Substitui o candle em formação e anexa os novos, mantendo no máximo LIMIT_CANDLES"""
+        cached = self.candles.setdefault(symbol, [])
+        first_ts = delta[0][0]
+        while cached and cached[-1][0] >= first_ts:
+            cached.pop()
+        cached.extend(list(c) for c in delta)
+
+        excess = len(cached) - self.config.LIMIT_CANDLES
+        if excess > 0:
+            del cached[:excess]
+
+
+class TickerSnapshot:
+    """Um único fetch_tickers para todos os pares, compartilhado por TICKER_TTL segundos"""
+
+    def __init__(self, exchange, config):
+        self.exchange = exchange
+        self.config = config
+        self.tickers = {}
+        self.updated_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self):
+        return (time.time() - self.updated_at) < getattr(self.config, 'TICKER_TTL', 30)
+
+    async def refresh(self, symbols, force=False):
+        async with self.lock:
+            if not force and self.is_fresh():
+                return self.tickers
+            try:
+                with METRICS.timer('ticker_fetch'):
+                    tickers = await self.exchange.fetch_tickers(list(symbols))
+                self.tickers = {}
+                self.update(tickers)
+            except Exception as e:
+                # Mantém o snapshot anterior; tenta de novo no próximo ciclo
+                print(f"⚠️ Erro no snapshot de tickers: {e}")
+            return self.tickers
+
+    def update(self, tickers):
+        """Aplica um snapshot já baixado (ex: o fetch_tickers do scanner de mercado)"""
+        self.tickers.update({s: {
+            'symbol': s,
+            'last': t.get('last'),
+            'bid': t.get('bid'),
+            'ask': t.get('ask'),
+            'quoteVolume': t.get('quoteVolume') or 0,
+            'percentage': t.get('percentage'),
+            'timestamp': t.get('timestamp'),
+        } for s, t in tickers.items()})
+        self.updated_at = time.time()
+
+    def get(self, symbol):
+        return self.tickers.get(symbol)
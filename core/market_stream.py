@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+
+
+class MarketDataSource(ABC):
+    """Interface das fontes de dados em tempo real (Binance, replay local, etc)"""
+
+    def __init__(self):
+        self.on_kline = None    # callback(symbol, candle, closed)
+        self.on_ticker = None   # callback(symbol, ticker)
+        self.running = False
+
+    @abstractmethod
+    async def start(self, symbols, timeframe):
+        """Conecta e começa a chamar on_kline/on_ticker para os 'symbols'"""
+
+    async def stop(self):
+        self.running = False
+
+    def is_live(self):
+        return self.running
+
+    def _emit_kline(self, symbol, candle, closed):
+        if self.on_kline:
+            self.on_kline(symbol, candle, closed)
+
+    def _emit_ticker(self, symbol, ticker):
+        if self.on_ticker:
+            self.on_ticker(symbol, ticker)
+
+
+class BinanceStreamSource(MarketDataSource):
+    """WebSocket combinado da Binance: kline + ticker 24h de todos os pares"""
+
+    DEFAULT_URL = "wss://stream.binance.com:9443/stream"
+    SANDBOX_URL = "wss://testnet.binance.vision/stream"
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+        # STREAM_URL permite apontar para um servidor de replay local
+        self.url = getattr(config, 'STREAM_URL', None) or (self.SANDBOX_URL if config.SANDBOX_MODE else self.DEFAULT_URL)
+        self.ids = {}
+        self.task = None
+        self.last_message = 0.0
+
+    async def start(self, symbols, timeframe):
+        self.ids = {s.replace('/', '').lower(): s for s in symbols}
+        streams = []
+        for sid in self.ids:
+            streams += [f"{sid}@kline_{timeframe}", f"{sid}@ticker"]
+        self.running = True
+        self.task = asyncio.create_task(self._run(f"{self.url}?streams={'/'.join(streams)}"))
+
+    async def stop(self):
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def is_live(self):
+        # Sem mensagens há muito tempo -> o motor volta a usar o REST
+        stale = getattr(self.config, 'STREAM_STALE_SECONDS', 10)
+        return self.running and (time.time() - self.last_message) < stale
+
+    async def _run(self, url):
+        import websockets  # Dependência só necessária no modo STREAM
+
+        backoff = 1
+        while self.running:
+            try:
+                async with websockets.connect(url, ping_interval=20, max_size=2 ** 22) as ws:
+                    backoff = 1
+                    async for raw in ws:
+                        self.last_message = time.time()
+                        self._handle(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Stream desconectado: {e} (reconectando em {backoff}s)")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def _handle(self, msg):
+        data = msg.get('data', msg)
+        symbol = self.ids.get(str(data.get('s', '')).lower())
+        if not symbol:
+            return
+
+        if data.get('e') == 'kline':
+            k = data['k']
+            candle = [k['t'], float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+            self._emit_kline(symbol, candle, bool(k.get('x')))
+        elif data.get('e') == '24hrTicker':
+            self._emit_ticker(symbol, {
+                'symbol': symbol,
+                'last': float(data['c']),
+                'bid': float(data['b']),
+                'ask': float(data['a']),
+                'quoteVolume': float(data['q']),
+                'timestamp': data.get('E'),
+            })
+
+
+class ReplaySource(MarketDataSource):
+    """Reproduz eventos gravados [('kline', symbol, candle, closed) | ('ticker', symbol, ticker)]"""
+
+    def __init__(self, events, speed=0.0):
+        super().__init__()
+        self.events = events
+        self.speed = speed  # segundos entre eventos (0 = o mais rápido possível)
+        self.task = None
+
+    async def start(self, symbols, timeframe):
+        self.running = True
+        self.task = asyncio.create_task(self._run(set(symbols)))
+
+    async def stop(self):
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def _run(self, symbols):
+        for event in self.events:
+            if not self.running:
+                break
+            if event[1] in symbols:
+                if event[0] == 'kline':
+                    self._emit_kline(event[1], event[2], event[3])
+                else:
+                    self._emit_ticker(event[1], event[2])
+            await asyncio.sleep(self.speed)
+        self.running = False
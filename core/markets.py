@@ -0,0 +1,89 @@
+import asyncio
+import time
+from decimal import Decimal, ROUND_DOWN
+
+
+class MarketMetadata:
+    """
+    Cache dos metadados de mercado (step, tick, min notional, ativo).
+    Carregado uma vez e atualizado em segundo plano: nada de load_markets(True) antes de cada ordem.
+    """
+
+    def __init__(self, exchange, config):
+        self.exchange = exchange
+        self.config = config
+        self.table = {}
+        self.loaded_at = 0.0
+        self.lock = asyncio.Lock()
+        self.refresh_task = None
+        self.reload_task = None
+
+    async def load(self, reload=False):
+        async with self.lock:
+            await self.exchange.load_markets(reload)
+            self.table = {s: self._parse(m) for s, m in self.exchange.markets.items()}
+            self.loaded_at = time.time()
+        if self.refresh_task is None:
+            self.refresh_task = asyncio.create_task(self._refresh_loop())
+        return self.table
+
+    async def ensure_loaded(self):
+        if not self.table:
+            await self.load()
+
+    def request_refresh(self):
+        """Recarrega fora do caminho da ordem (ex: erro de mercado fechado ou de filtro)"""
+        if self.reload_task is None or self.reload_task.done():
+            self.reload_task = asyncio.create_task(self._safe_reload())
+
+    async def _safe_reload(self):
+        try:
+            await self.load(reload=True)
+        except Exception as e:
+            print(f"⚠️ Erro ao recarregar mercados: {e}")
+
+    async def _refresh_loop(self):
+        interval = getattr(self.config, 'MARKETS_REFRESH_INTERVAL', 3600)
+        while True:
+            await asyncio.sleep(interval)
+            await self._safe_reload()
+
+    @staticmethod
+    def _parse(market):
+        filters = {f.get('filterType'): f for f in (market.get('info') or {}).get('filters', [])}
+        lot = filters.get('LOT_SIZE', {})
+        price = filters.get('PRICE_FILTER', {})
+        notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+        limits = market.get('limits') or {}
+
+        step = Decimal(str(lot['stepSize'])) if lot.get('stepSize') else None
+        min_notional = notional.get('minNotional') or (limits.get('cost') or {}).get('min') or 0
+        return {
+            'active': bool(market.get('active', False)),
+            'step': step if step and step > 0 else None,
+            'tick': Decimal(str(price['tickSize'])) if price.get('tickSize') else None,
+            'min_qty': float(lot.get('minQty') or (limits.get('amount') or {}).get('min') or 0),
+            'min_notional': float(min_notional),
+        }
+
+    @staticmethod
+    def is_market_error(error):
+        """Erros que indicam metadados desatualizados (mercado fechado, filtro de lote/preço)"""
+        msg = str(error).lower()
+        return any(k in msg for k in ('closed', 'filter failure', '-1013', 'invalid symbol', 'not trading'))
+
+    def get(self, symbol):
+        return self.table.get(symbol)
+
+    def is_active(self, symbol):
+        info = self.table.get(symbol)
+        return bool(info and info['active'])
+
+    def amount_to_precision(self, symbol, amount):
+        """Arredonda para baixo (Floor) no stepSize do par, sem tocar na API"""
+        info = self.table.get(symbol)
+        if not info or info['step'] is None:
+            return self.exchange.amount_to_precision(symbol, amount)
+        step = info['step']
+        qty = (Decimal(str(amount)) / step).to_integral_value(rounding=ROUND_DOWN) * step
+        return format(qty.normalize(), 'f')
@@ -0,0 +1,173 @@
+import asyncio
+import bisect
+import threading
+import time
+
+# Limites dos buckets em segundos (mesmo esquema do histograma do Prometheus)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Timer:
+    """Context manager (sync) que mede um estágio; exceção -> outcome 'error' (e não é engolida)"""
+    __slots__ = ('metrics', 'stage', 'symbol', 'outcome', 't0')
+
+    def __init__(self, metrics, stage, symbol):
+        self.metrics = metrics
+        self.stage = stage
+        self.symbol = symbol
+        self.outcome = 'ok'
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = self.outcome if exc_type is None else ('cancelled' if exc_type is asyncio.CancelledError else 'error')
+        self.metrics.observe(self.stage, time.perf_counter() - self.t0, self.symbol, outcome)
+        if exc_type is not None and outcome == 'error':
+            self.metrics.count('errors', stage=self.stage, symbol=self.symbol, error=exc_type.__name__)
+        return False
+
+
+class Metrics:
+    """
+    Histogramas de latência por (estágio, par, resultado) e contadores, com custo de um bisect + soma por medição.
+    Exporta em texto do Prometheus (render) e num resumo de uma linha para o log (summary).
+    Snapshots de outros processos (shards) entram via absorb e saem com o label 'shard'.
+    """
+
+    def __init__(self, prefix='quantumcore'):
+        self.prefix = prefix
+        self.histograms = {}    # (stage, symbol, outcome) -> [contagem por bucket..., +Inf], soma, total
+        self.counters = {}      # (nome, ((label, valor), ...)) -> valor
+        self.remote = {}        # shard -> último snapshot dele (acumulado desde que o processo subiu)
+        self.lock = threading.Lock()   # DB e estado gravam em threads do executor
+        self.started = time.time()
+
+    def timer(self, stage, symbol=''):
+        return _Timer(self, stage, symbol)
+
+    def observe(self, stage, seconds, symbol='', outcome='ok'):
+        key = (stage, symbol, outcome)
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self.lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+            h[0][i] += 1
+            h[1] += seconds
+            h[2] += 1
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        """Cópia acumulada (histogramas, contadores), pronta para ir por uma multiprocessing.Queue"""
+        with self.lock:
+            return {k: (list(h[0]), h[1], h[2]) for k, h in self.histograms.items()}, dict(self.counters)
+
+    def absorb(self, shard, snapshot):
+        """Snapshot enviado por um shard: substitui o anterior dele (os valores já são acumulados)"""
+        with self.lock:
+            self.remote[shard] = snapshot
+
+    def _sources(self):
+        """[(labels extras, histogramas, contadores)]: este processo + o último snapshot de cada shard"""
+        with self.lock:
+            sources = [((), {k: (list(h[0]), h[1], h[2]) for k, h in self.histograms.items()}, dict(self.counters))]
+            for shard, (histograms, counters) in sorted(self.remote.items()):
+                sources.append(((('shard', shard),), histograms, counters))
+        return sources
+
+    # --- EXPORTAÇÃO ---
+    @staticmethod
+    def _labels(pairs):
+        return ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in pairs if v != '')
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus"""
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Latência por estágio do motor", f"# TYPE {name} histogram"]
+        counters = {}
+        for extra, histograms, source_counters in self._sources():
+            for (stage, symbol, outcome), (buckets, total, n) in sorted(histograms.items()):
+                base = self._labels((('stage', stage), ('symbol', symbol), ('outcome', outcome)) + extra)
+                cumulative = 0
+                for le, c in zip(BUCKETS + ('+Inf',), buckets):
+                    cumulative += c
+                    lines.append(f'{name}_bucket{{{base},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{base}}} {total:.6f}")
+                lines.append(f"{name}_count{{{base}}} {n}")
+            for (counter, labels), value in source_counters.items():
+                counters[(counter, labels + extra)] = value
+
+        seen = set()
+        for (counter, labels), value in sorted(counters.items()):
+            metric = f"{self.prefix}_{counter}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{{{self._labels(labels)}}} {value}")
+
+        lines.append(f"# TYPE {self.prefix}_uptime_seconds gauge")
+        lines.append(f"{self.prefix}_uptime_seconds {time.time() - self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _quantile(buckets, n, q):
+        """Limite superior do bucket que contém o quantil (aproximação do histograma)"""
+        target = q * n
+        cumulative = 0
+        for le, c in zip(BUCKETS + (float('inf'),), buckets):
+            cumulative += c
+            if cumulative >= target:
+                return le
+        return float('inf')
+
+    def summary(self):
+        """Uma linha por estágio (todos os pares e shards juntos): total, p50/p95 em ms e erros"""
+        stages = {}
+        swallowed = 0
+        for _, histograms, counters in self._sources():
+            for (stage, _, outcome), (buckets, _, n) in histograms.items():
+                row = stages.setdefault(stage, [[0] * (len(BUCKETS) + 1), 0, 0])
+                row[0] = [a + b for a, b in zip(row[0], buckets)]
+                row[1] += n
+                if outcome == 'error':
+                    row[2] += n
+            swallowed += sum(v for (name, _), v in counters.items() if name in ('errors', 'swallowed'))
+
+        parts = []
+        for stage, (buckets, n, errors) in sorted(stages.items()):
+            p50, p95 = self._quantile(buckets, n, 0.5) * 1000, self._quantile(buckets, n, 0.95) * 1000
+            parts.append(f"{stage}: {n} (p50≤{p50:.0f}ms p95≤{p95:.0f}ms{f' ❌{errors}' if errors else ''})")
+        return f"📈 MÉTRICAS | {' | '.join(parts) or 'sem dados'} | erros contados: {swallowed}"
+
+
+# Instância do processo: o motor, o histórico, o estado e o Telegram medem no mesmo lugar
+METRICS = Metrics()
+
+
+async def serve_metrics(host='127.0.0.1', port=9108, metrics=METRICS):
+    """Endpoint HTTP mínimo (GET /metrics) para o Prometheus, sem dependências extras"""
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+                pass
+            path = request.split()[1].decode() if len(request.split()) > 1 else '/'
+            if path.startswith('/metrics'):
+                status, body = '200 OK', metrics.render().encode()
+            else:
+                status, body = '404 Not Found', b'not found\n'
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,169 @@
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from core.backtest import prepare, simulate
+
+# Limites do Config que a varredura pode mexer: (grade padrão, faixa da amostragem aleatória)
+# Faixa em tupla = intervalo contínuo/inteiro; lista = sorteia entre os valores
+TUNABLE = {
+    'RSI_OVERSOLD': ([20, 25, 30, 35], (15, 40)),
+    'STOP_LOSS': ([0.015, 0.02, 0.025, 0.03], (0.01, 0.04)),
+    'BREAK_EVEN_TRIGGER': ([0.006, 0.008, 0.012], (0.004, 0.02)),
+    'USE_TRAILING_STOP': ([True, False], [True, False]),
+    'TAKE_PROFIT': ([0.015, 0.025, 0.035], (0.01, 0.05)),
+    'TRAILING_ACTIVATION': ([0.01, 0.015, 0.021], (0.008, 0.03)),
+    'TRAILING_CALLBACK': ([0.002, 0.003, 0.005], (0.001, 0.01)),
+    'ZOMBIE_TIMEOUT': ([3600, 7200, 14400], (1800, 21600)),
+}
+
+# Estado de cada processo do pool (preenchido uma vez no _init_worker)
+_worker = {}
+
+
+def space(kind='grid', names=None):
+    """Espaço de busca tirado do TUNABLE: 'grid' (valores da grade) ou 'ranges' (faixas da amostragem)"""
+    col = 0 if kind == 'grid' else 1
+    return {name: TUNABLE[name][col] for name in (names or TUNABLE)}
+
+
+def _relevant(combo):
+    """Tira o que não muda o resultado: TAKE_PROFIT só vale sem trailing, TRAILING_* só com trailing"""
+    if 'USE_TRAILING_STOP' not in combo:
+        return combo
+    drop = ('TAKE_PROFIT',) if combo['USE_TRAILING_STOP'] else ('TRAILING_ACTIVATION', 'TRAILING_CALLBACK')
+    return {k: v for k, v in combo.items() if k not in drop}
+
+
+def grid(space):
+    """{'RSI_OVERSOLD': [25, 30], ...} -> todas as combinações (sem repetir as que dão o mesmo resultado)"""
+    names = list(space)
+    seen, combos = set(), []
+    for values in itertools.product(*(space[n] for n in names)):
+        combo = _relevant(dict(zip(names, values)))
+        key = tuple(sorted(combo.items()))
+        if key not in seen:
+            seen.add(key)
+            combos.append(combo)
+    return combos
+
+
+def sample(space, n, seed=None):
+    """{'STOP_LOSS': (0.01, 0.04), 'RSI_OVERSOLD': [25, 30]} -> n combinações aleatórias (faixa contínua ou lista)"""
+    rng = random.Random(seed)
+    combos = []
+    for _ in range(n):
+        combo = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                combo[name] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+            else:
+                combo[name] = rng.choice(values)
+        combos.append(_relevant(combo))
+    return combos
+
+
+class SharedSeries:
+    """
+    Arrays de prepare() de todos os pares num único bloco de memória compartilhada.
+    Os processos do pool só mapeiam o bloco: indicadores calculados uma vez, sem cópia nem pickle.
+    """
+
+    def __init__(self, prepared):
+        self.layout = {}
+        size = 0
+        for symbol, series in prepared.items():
+            for key, arr in series.items():
+                self.layout.setdefault(symbol, {})[key] = (size, arr.shape[0], arr.dtype.str)
+                size += arr.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for symbol, series in prepared.items():
+            for key, arr in series.items():
+                offset, n, dtype = self.layout[symbol][key]
+                np.ndarray((n,), dtype=dtype, buffer=self.shm.buf, offset=offset)[:] = arr
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @staticmethod
+    def attach(name, layout):
+        shm = shared_memory.SharedMemory(name=name)
+        prepared = {symbol: {key: np.ndarray((n,), dtype=dtype, buffer=shm.buf, offset=offset)
+                             for key, (offset, n, dtype) in keys.items()}
+                    for symbol, keys in layout.items()}
+        return shm, prepared
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _init_worker(name, layout, config):
+    _worker['shm'], _worker['prepared'] = SharedSeries.attach(name, layout)
+    _worker['config'] = config
+
+
+def _evaluate(batch):
+    out = []
+    for combo in batch:
+        try:
+            out.append((combo, simulate(_worker['prepared'], _worker['config'], **combo).summary()))
+        except Exception as e:
+            out.append((combo, {'error': str(e)}))
+    return out
+
+
+class ParameterSweep:
+    """Avalia combinações de limites do Config contra o histórico em cache, em paralelo"""
+
+    def __init__(self, data, config, workers=None, batch_size=8):
+        self.config = config
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        t0 = time.perf_counter()
+        self.series = SharedSeries({s: prepare(ohlcv, config.SMA_PERIODS) for s, ohlcv in data.items() if len(ohlcv)})
+        self.prepare_seconds = time.perf_counter() - t0
+
+    def run(self, combos, progress=None):
+        unknown = {k for combo in combos for k in combo} - set(TUNABLE)
+        if unknown:
+            # O simulate ignoraria em silêncio (erro de digitação viraria "nenhum efeito")
+            raise ValueError(f"Parâmetros fora do TUNABLE: {', '.join(sorted(unknown))}")
+        results = []
+        batches = [combos[i:i + self.batch_size] for i in range(0, len(combos), self.batch_size)]
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.series.name, self.series.layout, self.config)) as pool:
+            futures = [pool.submit(_evaluate, batch) for batch in batches]
+            for future in as_completed(futures):
+                results.extend(future.result())
+                if progress:
+                    progress(len(results), len(combos))
+        return results
+
+    def close(self):
+        self.series.close()
+
+
+def rank(results, metric='pnl', min_trades=10):
+    """Combinações válidas (com trades suficientes) da melhor para a pior pela métrica"""
+    valid = [(c, r) for c, r in results if 'error' not in r and r['trades'] >= min_trades]
+    return sorted(valid, key=lambda cr: cr[1][metric], reverse=metric != 'max_drawdown')
+
+
+def write_report(ranked, path):
+    """CSV com uma linha por combinação (parâmetros + métricas), já ordenado"""
+    if not ranked:
+        return
+    params = sorted({k for c, _ in ranked for k in c})
+    metrics = ['trades', 'pnl', 'win_rate', 'max_drawdown', 'open']
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank'] + params + metrics)
+        for i, (combo, summary) in enumerate(ranked, 1):
+            writer.writerow([i] + [combo.get(p) for p in params] + [summary[m] for m in metrics])
@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+import time
+import ccxt.async_support as ccxt
+
+# Prioridades (menor = mais importante)
+ORDER, EXIT, SCAN = 0, 1, 2
+
+# Prioridade da chamada atual; as tasks herdam do contexto de quem as criou
+request_priority = contextvars.ContextVar('request_priority', default=SCAN)
+
+
+class BudgetExceeded(Exception):
+    """Chamada de baixa prioridade descartada porque o orçamento de peso está apertado"""
+
+
+class WeightBudget:
+    """
+    Token bucket do peso de requisições da Binance (janela de 1 minuto).
+    Ordens nunca esperam; saídas de posições abertas esperam; varredura respeita uma reserva
+    e é descartada se tiver que esperar demais. 429/418 bloqueiam tudo que não é ordem.
+    """
+
+    def __init__(self, limit_per_minute=6000, usage=0.8, scan_reserve=0.25, scan_max_wait=2.0, share=1.0):
+        self.limit = limit_per_minute
+        self.share = share      # Fração do IP que cabe a este processo (motor dividido em shards)
+        self.capacity = limit_per_minute * usage * share
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.scan_reserve = self.capacity * scan_reserve
+        self.scan_max_wait = scan_max_wait
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.banned_until = 0.0     # 418: nem ordens passam até aqui
+        self.used_weight = 0
+        self.spent = self.dropped = self.bans = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, weight, priority):
+        waited = 0.0
+        while True:
+            self._refill()
+            blocked = self.blocked_until - time.monotonic()
+            floor = self.scan_reserve if priority == SCAN else 0.0
+
+            if priority == ORDER and self.banned_until > time.monotonic():
+                # 418 (IP banido): ordem enviada agora só renova o ban, que a Binance aumenta a cada reincidência
+                self.dropped += 1
+                raise BudgetExceeded(f"IP banido pela Binance por mais {self.banned_until - time.monotonic():.0f}s")
+
+            if priority == ORDER or (blocked <= 0 and self.tokens - weight >= floor):
+                self.tokens -= weight
+                self.spent += weight
+                return
+
+            wait = blocked if blocked > 0 else (weight + floor - self.tokens) / self.rate
+            if priority == SCAN and waited + wait > self.scan_max_wait:
+                self.dropped += 1
+                raise BudgetExceeded(f"orçamento de peso apertado (tokens={self.tokens:.0f}, peso={weight})")
+            step = min(wait, 1.0)
+            await asyncio.sleep(step)
+            waited += step
+
+    def observe(self, headers):
+        """Alinha com o peso usado que a Binance informa (x-mbx-used-weight-1m)"""
+        used = (headers or {}).get('x-mbx-used-weight-1m') or (headers or {}).get('X-MBX-USED-WEIGHT-1M')
+        if used is not None:
+            self.used_weight = int(used)
+            # O peso informado é do IP inteiro: cada processo responde pela sua fração dele
+            self.tokens = min(self.tokens, self.capacity - self.used_weight * self.share)
+
+    def penalize(self, headers=None, default=60, ban=False):
+        """429: para tudo que não é ordem até o Retry-After. 418 (ban): para as ordens também"""
+        retry = (headers or {}).get('Retry-After') or (headers or {}).get('retry-after')
+        self.blocked_until = time.monotonic() + (float(retry) if retry else default)
+        if ban:
+            self.banned_until = self.blocked_until
+        self.tokens = 0.0
+        self.bans += 1
+
+
+class BudgetedExchange:
+    """Proxy do ccxt: toda chamada de rede do motor passa pelo WeightBudget com seu peso"""
+
+    def __init__(self, exchange, budget):
+        self._exchange = exchange
+        self.budget = budget
+
+    def __getattr__(self, name):
+        return getattr(self._exchange, name)
+
+    # --- Pesos (Binance Spot) ---
+    @staticmethod
+    def _ohlcv_weight(limit):
+        return 2 if not limit or limit <= 500 else 5
+
+    @staticmethod
+    def _tickers_weight(symbols):
+        n = len(symbols) if symbols else 0
+        return 80 if n == 0 or n > 100 else (40 if n > 20 else 2)
+
+    async def _call(self, weight, fn, *args, priority=None, **kwargs):
+        priority = request_priority.get() if priority is None else priority
+        await self.budget.acquire(weight, priority)
+        try:
+            return await fn(*args, **kwargs)
+        except ccxt.DDoSProtection as e:
+            # 429/418: para de varrer até a Binance liberar (418 = IP banido, bloqueia as ordens também)
+            ban = '418' in str(e) or not isinstance(e, ccxt.RateLimitExceeded)
+            self.budget.penalize(getattr(self._exchange, 'last_response_headers', None), ban=ban)
+            raise
+        finally:
+            self.budget.observe(getattr(self._exchange, 'last_response_headers', None))
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        return await self._call(self._ohlcv_weight(limit), self._exchange.fetch_ohlcv, symbol, timeframe, since, limit, params)
+
+    async def fetch_ticker(self, symbol, params={}):
+        return await self._call(2, self._exchange.fetch_ticker, symbol, params)
+
+    async def fetch_tickers(self, symbols=None, params={}):
+        return await self._call(self._tickers_weight(symbols), self._exchange.fetch_tickers, symbols, params)
+
+    async def load_markets(self, reload=False, params={}):
+        if self._exchange.markets and not reload:
+            return self._exchange.markets
+        return await self._call(30, self._exchange.load_markets, reload, params)
+
+    async def fetch_time(self, params={}):
+        return await self._call(1, self._exchange.fetch_time, params)
+
+    async def fetch_balance(self, params={}):
+        return await self._call(20, self._exchange.fetch_balance, params)
+
+    async def create_market_buy_order(self, symbol, amount, params={}):
+        return await self._call(1, self._exchange.create_market_buy_order, symbol, amount, params, priority=ORDER)
+
+    async def create_market_sell_order(self, symbol, amount, params={}):
+        return await self._call(1, self._exchange.create_market_sell_order, symbol, amount, params, priority=ORDER)
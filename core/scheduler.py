@@ -0,0 +1,137 @@
+import asyncio
+import time
+from collections import deque
+from core.metrics import METRICS
+
+
+class CycleScheduler:
+    """
+    Agendador por eventos no lugar do trading_cycle com sleep(1).
+    - Entradas: cada par é avaliado uma vez por fechamento de candle, com o candle que acabou de fechar.
+    - Saídas: pares com trade aberto são checados a cada EXIT_CHECK_INTERVAL.
+    - Uma task por par: um par lento não atrasa os outros (sem barreira global de gather).
+    """
+
+    def __init__(self, engine, config):
+        self.engine = engine
+        self.config = config
+        self.running = False
+        self.tasks = {}
+        self.results = {}                    # Último snapshot de cada par ainda não publicado
+        self.durations = deque(maxlen=1000)  # ms por avaliação
+        self.lags = deque(maxlen=1000)       # ms de atraso em relação ao horário agendado
+        self.evaluations = 0
+        self.last_report = time.time()
+
+    def _timeframe_ms(self):
+        timeframe = getattr(self.config, 'TIMEFRAME', '1m')
+        return self.engine.exchange.parse_timeframe(timeframe) * 1000
+
+    def _next_close(self, now):
+        """Horário (s) do próximo fechamento de candle, com uma folga para a Binance fechar o candle"""
+        tf = self._timeframe_ms()
+        return ((int(now * 1000) // tf) + 1) * tf / 1000 + getattr(self.config, 'CANDLE_CLOSE_DELAY', 1.0)
+
+    async def run(self):
+        self.running = True
+        await self.engine.refresh_universe()
+        await self.engine.tickers.refresh([p['symbol'] for p in self.engine.pairs])
+        self._sync_tasks()
+        try:
+            await self._housekeeping()
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.running = False
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks = {}
+
+    def _sync_tasks(self):
+        """Uma task por par do universo atual: cria as dos pares novos e cancela as dos que saíram"""
+        symbols = {p['symbol'] for p in self.engine.pairs}
+        for s in list(self.tasks):
+            if s not in symbols:
+                self.tasks.pop(s).cancel()
+                self.results.pop(s, None)
+        for pair in self.engine.pairs:
+            if pair['symbol'] not in self.tasks:
+                self.tasks[pair['symbol']] = asyncio.create_task(self._symbol_loop(pair))
+
+    async def _symbol_loop(self, pair):
+        s = pair['symbol']
+        engine = self.engine
+        exit_interval = getattr(self.config, 'EXIT_CHECK_INTERVAL', 1.0)
+        # Fechamentos de candle no relógio do mercado (na corretora simulada ele anda SIM_SPEED x mais rápido)
+        next_entry = next_exit = engine.now()
+
+        while self.running:
+            now = engine.now()
+            in_trade = s in engine.active_trades
+            entry_due = now >= next_entry
+            saturated = engine._slots_used() >= self.config.MAX_OPEN_TRADES
+
+            if in_trade or (entry_due and not saturated):
+                # Atraso medido contra o prazo que venceu: fechamento do candle ou a checagem de saída anterior + intervalo
+                scheduled = next_entry if entry_due else next_exit
+                t0 = time.perf_counter()
+                try:
+                    result = await engine._process_pair(pair, closed=entry_due and not in_trade)
+                except Exception as e:
+                    result = None
+                    METRICS.count('swallowed', stage='scheduler', symbol=s, error=type(e).__name__)
+                    engine.update_queue.put(('log', f"Erro em {s}: {e}"))
+                self.durations.append((time.perf_counter() - t0) * 1000)
+                self.lags.append(max(0.0, (now - scheduled) / engine.speed * 1000))
+                self.evaluations += 1
+                if result:
+                    self.results[s] = result
+                next_exit = now + exit_interval * engine.speed
+
+            if entry_due:
+                next_entry = self._next_close(engine.now())
+
+            # Com trade aberto: checa de novo em EXIT_CHECK_INTERVAL (real); sem trade: dorme até o próximo candle
+            wait = (next_entry - engine.now()) / engine.speed
+            if s in engine.active_trades: wait = min(wait, exit_interval)
+            await asyncio.sleep(max(0.0, min(wait, exit_interval * 5)))
+
+    async def _housekeeping(self):
+        """Tickers em lote, publicação dos snapshots e relatório de tempo, uma vez por segundo"""
+        report_every = getattr(self.config, 'SCHEDULER_REPORT_INTERVAL', 60)
+        while self.running:
+            await asyncio.sleep(1)
+            try:
+                await self.engine.refresh_universe()
+                self._sync_tasks()
+                await self.engine.tickers.refresh([p['symbol'] for p in self.engine.pairs])
+                if self.results:
+                    results, self.results = list(self.results.values()), {}
+                    await self.engine.publish(results)
+            except Exception as e:
+                METRICS.count('swallowed', stage='housekeeping', error=type(e).__name__)
+                self.engine.update_queue.put(('log', f"Erro Agendador: {e}"))
+
+            if time.time() - self.last_report >= report_every:
+                self.last_report = time.time()
+                self.engine.update_queue.put(('log', self.summary()))
+
+    def timing(self):
+        """Estatísticas de tempo para saber se o motor está dando conta"""
+        durations = sorted(self.durations)
+        lags = sorted(self.lags)
+        pick = lambda data, q: data[min(len(data) - 1, int(q * len(data)))] if data else 0.0
+        return {
+            'evaluations': self.evaluations,
+            'eval_p50_ms': pick(durations, 0.5),
+            'eval_p99_ms': pick(durations, 0.99),
+            'lag_p50_ms': pick(lags, 0.5),
+            'lag_max_ms': lags[-1] if lags else 0.0,
+        }
+
+    def summary(self):
+        t = self.timing()
+        return (f"⏱️ AGENDADOR: {t['evaluations']} avaliações | "
+                f"p50 {t['eval_p50_ms']:.0f}ms / p99 {t['eval_p99_ms']:.0f}ms | "
+                f"atraso p50 {t['lag_p50_ms']:.0f}ms / máx {t['lag_max_ms']:.0f}ms")
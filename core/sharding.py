@@ -0,0 +1,445 @@
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.engine import TradingEngine
+from core.history import TradeHistory, TradeStats
+from core.state_store import StateStore
+from core.metrics import METRICS
+from core.scheduler import CycleScheduler
+
+
+def split_pairs(symbols, trades, shards):
+    """Distribui os pares entre os shards (round-robin). Par com trade aberto fora da lista vai para o shard mais leve"""
+    groups = [[] for _ in range(shards)]
+    for i, s in enumerate(symbols):
+        groups[i % shards].append(s)
+    for s in trades:
+        if not any(s in g for g in groups):
+            min(groups, key=len).append(s)
+    return groups
+
+
+class SlotCoordinator:
+    """
+    Dono único dos slots de MAX_OPEN_TRADES (roda no processo principal).
+    Reserva é atômica: as mensagens dos shards são tratadas uma por vez no loop principal,
+    então dois shards nunca ganham o último slot ao mesmo tempo.
+    O slot volta quando o estado enviado pelo shard não tem mais o par (venda ou compra que falhou).
+    """
+
+    def __init__(self, max_slots):
+        self.max_slots = max_slots
+        self.owners = {}        # symbol -> shard dono do slot
+        self.granted = self.rejected = 0
+
+    def used(self):
+        return len(self.owners)
+
+    def reserve(self, shard, symbol):
+        if symbol in self.owners:
+            ok = self.owners[symbol] == shard
+        else:
+            ok = len(self.owners) < self.max_slots
+            if ok:
+                self.owners[symbol] = shard
+        if ok:
+            self.granted += 1
+        else:
+            self.rejected += 1
+        return ok
+
+    def sync(self, shard, trades):
+        """Estado mais recente do shard: libera os slots dele que sumiram. True se algo mudou"""
+        changed = False
+        for s in [s for s, owner in self.owners.items() if owner == shard and s not in trades]:
+            del self.owners[s]
+            changed = True
+        for s, trade in trades.items():
+            # Posição real que ninguém reservou (ex: estado carregado do disco) também ocupa slot.
+            # 'Pendente' sem reserva é só o placeholder de um pedido ainda sem resposta (ou negado): não conta
+            if s not in self.owners and trade.get('status') != 'Pendente' and trade.get('qty'):
+                self.owners[s] = shard
+                changed = True
+        return changed
+
+
+# --- LADO DO SHARD (processo filho) ---
+class ShardLink:
+    """Canal do shard com o processo principal: eventos saem por 'outbox', respostas chegam por 'inbox'"""
+
+    def __init__(self, shard, inbox, outbox, reserve_timeout=5.0):
+        self.shard = shard
+        self.inbox = inbox
+        self.outbox = outbox
+        self.reserve_timeout = reserve_timeout
+        self.used = 0               # Slots ocupados no total (todos os shards), enviado pelo coordenador
+        self.pending = {}
+        self.ids = itertools.count()
+        self.closed = False
+        self.engine = None
+
+    def send(self, kind, *payload):
+        self.outbox.put((kind, self.shard) + payload)
+
+    async def reserve(self, symbol):
+        """Pede um slot ao coordenador. Sem resposta a tempo conta como negado"""
+        req = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[req] = future
+        self.send('reserve', req, symbol)
+        try:
+            return await asyncio.wait_for(future, self.reserve_timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.pending.pop(req, None)
+
+    async def listen(self):
+        loop = asyncio.get_running_loop()
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"shard-{self.shard}")
+        while not self.closed:
+            msg = await loop.run_in_executor(reader, self.inbox.get)
+            kind = msg[0]
+            if kind == 'reserved':
+                future = self.pending.get(msg[1])
+                if future and not future.done():
+                    future.set_result(msg[2])
+            elif kind == 'slots':
+                self.used = msg[1]
+            elif kind == 'balance' and self.engine:
+                self.engine.ledger.mark_dirty()   # Outro shard executou: o saldo local deste ficou velho
+            elif kind == 'panic' and self.engine:
+                asyncio.create_task(self.engine.emergency_close_all())
+            elif kind == 'stop':
+                self.closed = True
+        reader.shutdown(wait=False)
+
+
+class ShardQueue:
+    """update_queue do shard: logs e snapshots vão para a fila da GUI/servidor no processo principal"""
+
+    def __init__(self, link):
+        self.link = link
+
+    def put(self, item):
+        if item[0] == 'portfolio' and self.link.engine:
+            # O principal escolhe o saldo conciliado mais recente entre os shards
+            item = ('portfolio', dict(item[1], reconciled_at=self.link.engine.ledger.reconciled_at))
+        self.link.send('ui', item)
+
+
+class ShardTelegram:
+    """Notificações do shard são enviadas pelo Telegram do processo principal"""
+
+    def __init__(self, link):
+        self.link = link
+
+    def notify(self, text):
+        self.link.send('notify', text)
+
+    async def send_chart(self, symbol, ohlcv, side, price, pnl_str=None):
+        self.link.send('chart', (symbol, list(ohlcv), side, price, pnl_str))
+
+
+class ShardHistory:
+    """Trades executados no shard são gravados pelo TradeHistory do processo principal"""
+
+    def __init__(self, link):
+        self.link = link
+        self.stats = TradeStats()   # Fica vazio: o histórico da GUI é publicado pelo principal
+
+    async def record(self, symbol, side, price, qty, pnl=None, timestamp=None):
+        # Horário da execução no shard, não o da gravação no principal
+        self.link.send('trade', (symbol, side, price, qty, pnl, timestamp or time.strftime('%Y-%m-%d %H:%M:%S')))
+
+
+class ShardState:
+    """active_trades do shard: alterações dentro de 'delay' viram um envio só ao principal, que grava o JSON"""
+
+    def __init__(self, link, trades, delay=0.5):
+        self.link = link
+        self.data = trades
+        self.delay = delay
+        self.handle = None
+
+    def load(self):
+        return self.data
+
+    def save(self, data):
+        self.data = data
+        if self.handle is None:
+            self.handle = asyncio.get_running_loop().call_later(self.delay, self.close)
+
+    async def commit(self, data):
+        """Compra/venda executada: envia na hora (o principal grava sem esperar a janela)"""
+        self.data = data
+        self.close(urgent=True)
+
+    def close(self, urgent=False):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        # Cópia tirada agora: a fila serializa depois, em outra thread
+        self.link.send('state', {s: dict(t) for s, t in self.data.items()}, urgent)
+
+
+class ShardEngine(TradingEngine):
+    """
+    TradingEngine de um shard: só analisa e opera os pares dele.
+    Abrir posição exige reserva no SlotCoordinator; estado, histórico e Telegram vão para o processo principal.
+    """
+
+    def __init__(self, link, shards, symbols, trades, config):
+        self.link = link
+        self.shards = shards
+        self.initial_trades = trades
+        super().__init__(ShardQueue(link), config, telegram=ShardTelegram(link))
+        self.pairs = [{'symbol': s} for s in symbols]
+        self.history_version = self.history.stats.version
+        link.engine = self
+
+    def _weight_budget(self, share=1.0):
+        # Mesmo IP para todos os shards: cada um fica com a sua fração do orçamento
+        return super()._weight_budget(share / self.shards)
+
+    def _open_history(self):
+        return ShardHistory(self.link)
+
+    def _open_state(self):
+        return ShardState(self.link, self.initial_trades, getattr(self.config, 'STATE_FLUSH_DELAY', 0.5))
+
+    def _slots_used(self):
+        return max(self.link.used, len(self.active_trades))
+
+    async def _reserve_slot(self, symbol):
+        return await self.link.reserve(symbol)
+
+    async def refresh_universe(self):
+        return  # Os pares de cada shard são definidos pelo processo principal
+
+
+def run_shard(shard, shards, symbols, trades, config, inbox, outbox):
+    """Ponto de entrada do processo filho"""
+    try:
+        asyncio.run(_shard_main(shard, shards, symbols, trades, config, inbox, outbox))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _shard_main(shard, shards, symbols, trades, config, inbox, outbox):
+    link = ShardLink(shard, inbox, outbox, getattr(config, 'SLOT_RESERVE_TIMEOUT', 5.0))
+    engine = ShardEngine(link, shards, symbols, trades, config)
+    listener = asyncio.create_task(link.listen())
+
+    scheduler = None
+    push_interval = getattr(config, 'METRICS_PUSH_INTERVAL', 15)
+    last_push = time.time()
+    try:
+        await engine.start()
+        if config.ENGINE_LOOP == 'SCHEDULER':
+            scheduler = CycleScheduler(engine, config)
+            asyncio.create_task(scheduler.run())
+        while not link.closed:
+            if scheduler is None:
+                await engine.trading_cycle()
+            if time.time() - last_push >= push_interval:
+                # Métricas deste processo vão para o /metrics do principal (label 'shard')
+                last_push = time.time()
+                link.send('metrics', METRICS.snapshot())
+            await asyncio.sleep(1)
+    except Exception as e:
+        link.send('ui', ('log', f"☠️ Shard {shard} caiu: {e}"))
+    finally:
+        engine.running = False
+        if scheduler:
+            scheduler.stop()
+        await engine.executor.stop()
+        if engine.stream:
+            await engine.stream.stop()
+        engine.state.close(urgent=True)
+        link.send('metrics', METRICS.snapshot())
+        try:
+            await engine.exchange.close()
+        except Exception:
+            pass
+        if not link.closed:
+            inbox.put(('stop',))   # Destrava a thread que lê a inbox (senão o processo não termina)
+        await listener
+
+
+# --- LADO PRINCIPAL ---
+class ShardSupervisor:
+    """
+    Modo ENGINE_SHARDS > 1: os pares são divididos entre processos (cada um com seu TradingEngine).
+    Este processo é o único dono dos slots (SlotCoordinator), do active_trades.json, do histórico e do Telegram.
+    Expõe 'history' e 'active_trades' como o TradingEngine, para o /status do Telegram.
+    """
+
+    def __init__(self, update_queue, config, telegram=None):
+        self.update_queue = update_queue
+        self.config = config
+        self.telegram = telegram
+        self.shards = config.ENGINE_SHARDS
+        self.history = TradeHistory('trades_history.db')
+        self.state = StateStore('active_trades.json', getattr(config, 'STATE_FLUSH_DELAY', 0.5))
+        self.slots = SlotCoordinator(config.MAX_OPEN_TRADES)
+
+        # 'Pendente' gravado por versões antigas não tem qty: nunca vira posição, só prenderia o slot
+        trades = {s: t for s, t in self.state.load().items() if t.get('status') != 'Pendente'}
+        symbols = [p['symbol'] for p in config.PAIRS]
+        self.groups = split_pairs(symbols, trades, self.shards)
+        self.trades = {}        # shard -> active_trades mais recente dele
+        for i, group in enumerate(self.groups):
+            self.trades[i] = {s: t for s, t in trades.items() if s in group}
+            self.slots.sync(i, self.trades[i])
+
+        self.context = multiprocessing.get_context('spawn')
+        self.events = self.context.Queue()
+        self.inboxes = [self.context.Queue() for _ in range(self.shards)]
+        self.processes = [None] * self.shards
+        self.portfolios = {}    # shard -> último portfolio dele (saldo + quando foi conciliado)
+        self.reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shard-events")
+        self.stopping = False
+        self.finished = asyncio.Event()
+
+    @property
+    def active_trades(self):
+        merged = {}
+        for trades in self.trades.values():
+            merged.update(trades)
+        return merged
+
+    def _spawn(self, shard):
+        # Último estado enviado pelo shard pode ter 'Pendente' sem qty: no restart viraria posição e prenderia o slot
+        self.trades[shard] = {s: t for s, t in self.trades[shard].items() if t.get('status') != 'Pendente'}
+        if self.slots.sync(shard, self.trades[shard]):
+            self._broadcast(('slots', self.slots.used()))
+        process = self.context.Process(
+            target=run_shard, name=f"shard-{shard}", daemon=True,
+            args=(shard, self.shards, self.groups[shard], self.trades[shard], self.config, self.inboxes[shard], self.events),
+        )
+        process.start()
+        self.processes[shard] = process
+        self.inboxes[shard].put(('slots', self.slots.used()))
+
+    async def start(self):
+        if getattr(self.config, 'UNIVERSE_MODE', 'FIXED') == 'SCAN':
+            self.update_queue.put(('log', "⚠️ UNIVERSE_MODE=SCAN não é suportado com ENGINE_SHARDS: usando a lista PAIRS"))
+        for shard in range(self.shards):
+            self._spawn(shard)
+        self.update_queue.put(('log', f"🧩 {self.shards} SHARDS: {' | '.join(str(len(g)) for g in self.groups)} pares | slots {self.slots.used()}/{self.slots.max_slots}"))
+
+    def _next_event(self):
+        try:
+            return self.events.get(timeout=1)
+        except queue.Empty:
+            return None
+
+    async def run(self):
+        """Único consumidor dos eventos dos shards: tudo que mexe em slots e estado passa aqui, em ordem"""
+        loop = asyncio.get_running_loop()
+        while True:
+            msg = await loop.run_in_executor(self.reader, self._next_event)
+            if msg is None:
+                if self.stopping and not self._alive():
+                    break
+                self._check_alive()
+                continue
+            try:
+                await self._handle(msg)
+            except Exception as e:
+                METRICS.count('swallowed', stage='supervisor', error=type(e).__name__)
+                self.update_queue.put(('log', f"Erro Supervisor: {e}"))
+        self.finished.set()
+
+    def _alive(self):
+        return sum(1 for p in self.processes if p is not None and p.is_alive())
+
+    def _check_alive(self):
+        """Shard que morreu é recriado com os trades que ele tinha (as posições continuam abertas na Binance)"""
+        for shard, process in enumerate(self.processes):
+            if not self.stopping and process is not None and not process.is_alive():
+                METRICS.count('errors', stage='shard', error='died')
+                self.update_queue.put(('log', f"☠️ Shard {shard} morreu (código {process.exitcode}). Reiniciando..."))
+                self._spawn(shard)
+
+    def _broadcast(self, msg):
+        for inbox in self.inboxes:
+            inbox.put(msg)
+
+    async def _handle(self, msg):
+        kind, shard = msg[0], msg[1]
+        if kind == 'reserve':
+            _, _, req, symbol = msg
+            ok = self.slots.reserve(shard, symbol)
+            self.inboxes[shard].put(('reserved', req, ok))
+            if ok:
+                self._broadcast(('slots', self.slots.used()))
+            else:
+                METRICS.count('dropped', stage='slot_reserve', symbol=symbol)
+        elif kind == 'state':
+            self.trades[shard] = msg[2]
+            if self.slots.sync(shard, msg[2]):
+                self._broadcast(('slots', self.slots.used()))
+            # Compra em andamento não vai para o disco: sem qty, depois de um restart ela prenderia um slot para sempre
+            trades = {s: t for s, t in self.active_trades.items() if t.get('status') != 'Pendente'}
+            if msg[3]:
+                await self.state.commit(trades)     # Compra/venda executada: grava sem esperar a janela
+            else:
+                self.state.save(trades)
+        elif kind == 'trade':
+            await self.history.record(*msg[2])
+            self.update_queue.put(('trade_history', self.history.stats.recent_sells(10)))
+            # Os outros shards não viram a execução: conciliam o saldo antes do próximo publish
+            for i, inbox in enumerate(self.inboxes):
+                if i != shard:
+                    inbox.put(('balance',))
+        elif kind == 'notify':
+            if self.telegram:
+                self.telegram.notify(msg[2])
+        elif kind == 'chart':
+            if self.telegram:
+                await self.telegram.send_chart(*msg[2])
+        elif kind == 'metrics':
+            METRICS.absorb(shard, msg[2])
+        elif kind == 'ui':
+            item = msg[2]
+            if item[0] == 'portfolio':
+                # Saldo é da conta: vale o do shard que conciliou com a Binance por último. PnL aberto é a soma dos shards
+                self.portfolios[shard] = item[1]
+                latest = max(self.portfolios.values(), key=lambda p: p.get('reconciled_at', 0))
+                item = ('portfolio', {
+                    'available_capital': latest['available_capital'],
+                    'floating_pnl': sum(p['floating_pnl'] for p in self.portfolios.values()),
+                })
+            self.update_queue.put(item)
+
+    async def emergency_close_all(self):
+        self.update_queue.put(('log', "🚨 PÂNICO: zerando posições em todos os shards..."))
+        self._broadcast(('panic',))
+
+    async def stop(self, timeout=10):
+        """Para os shards (cada um manda o estado final), espera o run() consumir tudo e grava o active_trades.json"""
+        self.stopping = True
+        self._broadcast(('stop',))
+        try:
+            await asyncio.wait_for(self.finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            for process in self.processes:
+                if process is not None and process.is_alive():
+                    process.terminate()
+        self.state.close()
+        self.history.close()
+
+    def stats(self):
+        return {
+            'shards': self.shards,
+            'alive': self._alive(),
+            'slots_used': self.slots.used(),
+            'slots_granted': self.slots.granted,
+            'slots_rejected': self.slots.rejected,
+        }
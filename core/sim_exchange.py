@@ -0,0 +1,214 @@
+import asyncio
+import itertools
+import math
+import time
+import numpy as np
+import ccxt.async_support as ccxt
+from core.backtest import load_history
+
+TIMEFRAME_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def synthetic_candles(n, price=100.0, timeframe_ms=60000, seed=None, vol=0.002, start=None):
+    """Passeio aleatório log-normal no formato do ccxt (n, 6) para quando não há histórico gravado"""
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0, vol / 2, n))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    start = start if start is not None else (int(time.time() * 1000) // timeframe_ms - n) * timeframe_ms
+    ts = start + np.arange(n) * timeframe_ms
+    volume = rng.uniform(1e3, 1e4, n) / close   # ~8 milhões de USDT em 24h (passa no MIN_VOLUME_24H)
+    return np.column_stack([ts, open_, high, low, close, volume])
+
+
+class SimulatedExchange:
+    """
+    Binance local (subconjunto do ccxt async usado pelo TradingEngine) alimentada por candles gravados ou sintéticos.
+    O relógio simulado anda 'speed' vezes mais rápido que o real; o candle atual vai se formando entre open e close.
+    Ordens a mercado esperam 'latency', sofrem 'slippage' sobre bid/ask e pagam 'fee' em USDT.
+    """
+
+    def __init__(self, data, timeframe='1m', speed=1.0, latency=0.05, slippage=0.0005, fee=0.001,
+                 balance=1000.0, spread=0.0002, warmup=600):
+        self.data = {s: np.asarray(c, dtype=np.float64) for s, c in data.items() if len(c) > warmup}
+        self.timeframe = timeframe
+        self.tf_ms = self.parse_timeframe(timeframe) * 1000
+        self.speed = speed
+        self.latency = latency
+        self.slippage = slippage
+        self.fee = fee
+        self.spread = spread
+        self.balances = {'USDT': float(balance)}
+        self.markets = {}
+        self.options = {}
+        self.last_response_headers = {}
+        self.order_ids = itertools.count(1)
+        self.orders = []
+
+        # Volume 24h em USDT por candle (somas acumuladas para o ticker sair em O(1))
+        window = max(1, 86400000 // self.tf_ms)
+        self.quote_cum = {}
+        for s, c in self.data.items():
+            self.quote_cum[s] = (np.concatenate(([0.0], np.cumsum(c[:, 4] * c[:, 5]))), window)
+
+        # Começa depois do aquecimento (SMA 500 já tem histórico) e anda a partir do relógio real
+        self.sim_start = max(c[warmup, 0] for c in self.data.values()) if self.data else time.time() * 1000
+        self.real_start = time.time()
+
+    @classmethod
+    def from_config(cls, config):
+        symbols = [p['symbol'] for p in config.PAIRS]
+        timeframe = getattr(config, 'TIMEFRAME', '1m')
+        data = load_history(getattr(config, 'BACKTEST_DATA_DIR', 'backtest_data'), symbols, timeframe)
+        tf_ms = cls.parse_timeframe(timeframe) * 1000
+        for i, s in enumerate(symbols):
+            if s not in data:
+                data[s] = synthetic_candles(20000, price=10.0 * (i + 1), timeframe_ms=tf_ms, seed=i)
+        return cls(data, timeframe, speed=config.SIM_SPEED, latency=config.SIM_LATENCY,
+                   slippage=config.SIM_SLIPPAGE, fee=config.SIM_FEE, balance=config.SIM_BALANCE)
+
+    # --- RELÓGIO ---
+    def now(self):
+        """Timestamp simulado (ms)"""
+        return self.sim_start + (time.time() - self.real_start) * 1000 * self.speed
+
+    def _index(self, symbol, now=None):
+        candles = self.data[symbol]
+        i = int(np.searchsorted(candles[:, 0], now or self.now(), side='right')) - 1
+        return min(max(i, 0), len(candles) - 1)
+
+    def _current(self, symbol):
+        """Candle em formação: close interpolado entre open e close pelo tempo decorrido no candle"""
+        now = self.now()
+        i = self._index(symbol, now)
+        ts, o, h, l, c, v = self.data[symbol][i].tolist()
+        frac = min(1.0, max(0.0, (now - ts) / self.tf_ms))
+        price = o + (c - o) * frac
+        return i, [ts, o, max(o, price) if frac < 1 else h, min(o, price) if frac < 1 else l, price, v * frac]
+
+    def _check(self, symbol):
+        if symbol not in self.data:
+            raise ccxt.BadSymbol(f"binance does not have market symbol {symbol}")
+
+    # --- MERCADOS ---
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return int(timeframe[:-1]) * TIMEFRAME_SECONDS[timeframe[-1]]
+
+    def set_sandbox_mode(self, enabled):
+        pass
+
+    async def close(self):
+        pass
+
+    async def load_markets(self, reload=False, params={}):
+        if self.markets and not reload:
+            return self.markets
+        for s, candles in self.data.items():
+            price = float(candles[self._index(s), 4])
+            step = min(1.0, max(1e-8, 10 ** math.floor(math.log10(0.01 / price))))
+            tick = max(1e-8, 10 ** math.floor(math.log10(price * 1e-4)))
+            base, quote = s.split('/')
+            self.markets[s] = {
+                'id': s.replace('/', ''), 'symbol': s, 'base': base, 'quote': quote, 'active': True, 'spot': True,
+                'precision': {'amount': step, 'price': tick},
+                'limits': {'amount': {'min': step}, 'cost': {'min': 5.0}},
+                'info': {'filters': [
+                    {'filterType': 'LOT_SIZE', 'stepSize': f"{step:.8f}", 'minQty': f"{step:.8f}"},
+                    {'filterType': 'PRICE_FILTER', 'tickSize': f"{tick:.8f}"},
+                    {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'},
+                ]},
+            }
+        return self.markets
+
+    def market(self, symbol):
+        self._check(symbol)
+        return self.markets[symbol]
+
+    def amount_to_precision(self, symbol, amount):
+        step = self.market(symbol)['precision']['amount']
+        decimals = max(0, -int(math.floor(math.log10(step))))
+        return f"{math.floor(amount / step + 1e-9) * step:.{decimals}f}"
+
+    # --- DADOS ---
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        self._check(symbol)
+        i, current = self._current(symbol)
+        candles = self.data[symbol]
+        limit = limit or 500
+        if since is not None:
+            start = int(np.searchsorted(candles[:, 0], since, side='left'))
+            rows = candles[start:min(i, start + limit)].tolist()
+        else:
+            rows = candles[max(0, i - limit + 1):i].tolist()
+        if len(rows) < limit and (since is None or current[0] >= since):
+            rows.append(current)
+        return rows
+
+    async def fetch_ticker(self, symbol, params={}):
+        self._check(symbol)
+        i, current = self._current(symbol)
+        last = current[4]
+        cum, window = self.quote_cum[symbol]
+        open_24h = float(self.data[symbol][max(0, i - window + 1), 1])
+        return {
+            'symbol': symbol, 'timestamp': int(self.now()), 'last': last, 'close': last,
+            'bid': last * (1 - self.spread / 2), 'ask': last * (1 + self.spread / 2),
+            'quoteVolume': float(cum[i] - cum[max(0, i - window + 1)]) + current[4] * current[5],
+            'percentage': (last - open_24h) / open_24h * 100,
+        }
+
+    async def fetch_tickers(self, symbols=None, params={}):
+        return {s: await self.fetch_ticker(s) for s in (symbols or self.data) if s in self.data}
+
+    async def fetch_time(self, params={}):
+        return int(time.time() * 1000)
+
+    async def fetch_balance(self, params={}):
+        free = {asset: amount for asset, amount in self.balances.items()}
+        used = {asset: 0.0 for asset in free}
+        out = {'free': free, 'used': used, 'total': dict(free)}
+        for asset, amount in free.items():
+            out[asset] = {'free': amount, 'used': 0.0, 'total': amount}
+        return out
+
+    # --- ORDENS ---
+    async def create_market_buy_order(self, symbol, amount, params={}):
+        return await self._fill(symbol, 'buy', float(amount))
+
+    async def create_market_sell_order(self, symbol, amount, params={}):
+        return await self._fill(symbol, 'sell', float(amount))
+
+    async def _fill(self, symbol, side, amount):
+        self._check(symbol)
+        if amount <= 0:
+            raise ccxt.InvalidOrder(f"binance Filter failure: LOT_SIZE ({symbol} {amount})")
+        await asyncio.sleep(self.latency)   # Preço é o do momento em que a ordem "chega"
+
+        ticker = await self.fetch_ticker(symbol)
+        base, quote = symbol.split('/')
+        if side == 'buy':
+            price = ticker['ask'] * (1 + self.slippage)
+            cost = price * amount
+            if self.balances.get(quote, 0.0) < cost * (1 + self.fee):
+                raise ccxt.InsufficientFunds("binance Account has insufficient balance for requested action.")
+            self.balances[quote] -= cost * (1 + self.fee)
+            self.balances[base] = self.balances.get(base, 0.0) + amount
+        else:
+            if self.balances.get(base, 0.0) + 1e-12 < amount:
+                raise ccxt.InsufficientFunds("binance Account has insufficient balance for requested action.")
+            price = ticker['bid'] * (1 - self.slippage)
+            cost = price * amount
+            self.balances[base] -= amount
+            self.balances[quote] = self.balances.get(quote, 0.0) + cost * (1 - self.fee)
+
+        order = {
+            'id': str(next(self.order_ids)), 'symbol': symbol, 'type': 'market', 'side': side,
+            'status': 'closed', 'timestamp': int(self.now()), 'amount': amount, 'filled': amount,
+            'price': price, 'average': price, 'cost': cost,
+            'fee': {'currency': quote, 'cost': cost * self.fee},
+        }
+        self.orders.append(order)
+        return order
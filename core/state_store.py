@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core.metrics import METRICS
+
+
+class StateStore:
+    """
+    Persistência do active_trades.json.
+    Várias alterações dentro de STATE_FLUSH_DELAY viram uma única escrita, feita fora do event loop
+    e de forma atômica (arquivo temporário + rename): um crash nunca deixa o JSON pela metade.
+    """
+
+    def __init__(self, path='active_trades.json', delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.data = {}
+        self.dirty = False
+        self.task = None
+        self.io_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-store")
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                self.data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ {self.path} ilegível ({e}). Começando sem trades ativos.")
+            self.data = {}
+        return self.data
+
+    def save(self, data):
+        """Marca o estado como alterado. A escrita acontece depois, em lote"""
+        self.data = data
+        self.dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fora do event loop (scripts, encerramento): grava na hora
+            self.close()
+            return
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self._flush_later())
+
+    async def commit(self, data):
+        """Grava agora (ainda fora do loop), sem esperar STATE_FLUSH_DELAY"""
+        self.data = data
+        self.dirty = True
+        await self.flush()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        while self.dirty:
+            self.dirty = False
+            payload = json.dumps(self.data)  # Snapshot tirado no loop: consistente
+            try:
+                await loop.run_in_executor(self.executor, self._write, payload)
+            except Exception as e:
+                print(f"⚠️ Erro ao salvar {self.path}: {e}")
+
+    def close(self):
+        """Grava pendências de forma síncrona (usado no encerramento)"""
+        if self.dirty:
+            self.dirty = False
+            self._write(json.dumps(self.data))
+
+    def write(self, data):
+        self.data = data
+        self.dirty = False
+        self._write(json.dumps(data))
+
+    def _write(self, payload):
+        with self.io_lock, METRICS.timer('state_save'):
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
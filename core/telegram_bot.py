@@ -1,20 +1,33 @@
 import asyncio
-from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
-import sqlite3
+from core.history import TradeHistory
 import time
-import io
-import mplfinance as mpf
-import pandas as pd
+from core.config import Config
+from core.charts import ChartRenderer
+from core.telegram_outbox import TelegramOutbox
 
 class TelegramManager:
     def __init__(self, token, chat_id, engine=None):
         self.token = token
         self.chat_id = chat_id
         self.engine = engine
+        self._history = None
+        self.charts = ChartRenderer(getattr(Config, 'CHART_WORKERS', 1), getattr(Config, 'CHART_QUEUE_SIZE', 4))
         self.application = Application.builder().token(token).build()
+        # Todas as mensagens saem por aqui: bot/conexões da Application, rate limit e rajadas agrupadas
+        self.outbox = TelegramOutbox(self.application, chat_id, getattr(Config, 'TELEGRAM_MIN_INTERVAL', 1.0))
         self._setup_handlers()
 
+    @property
+    def history(self):
+        # Usa a mesma conexão do motor; sem motor (ex: bot isolado) abre a sua
+        if self.engine is not None:
+            return self.engine.history
+        if self._history is None:
+            self._history = TradeHistory()
+        return self._history
+
     def _setup_handlers(self):
         self.application.add_handler(CommandHandler("start", self.menu_principal))
         self.application.add_handler(CommandHandler("status", self.status_comando))
@@ -42,9 +55,7 @@ class TelegramManager:
             await query.edit_message_text(msg, parse_mode='Markdown')
 
     def _get_detailed_report(self):
-        conn = sqlite3.connect('trades_history.db')
-        trades = conn.execute("SELECT symbol, side, price, pnl, timestamp FROM trades ORDER BY id DESC LIMIT 5").fetchall()
-        conn.close()
+        trades = self.history.stats.last_trades(5)
         
         if not trades: return "📭 Nenhum trade registrado ainda."
         
@@ -56,88 +67,53 @@ class TelegramManager:
         return report
 
     def _get_summary_report(self):
-        conn = sqlite3.connect('trades_history.db')
-        res = conn.execute("SELECT COUNT(*), SUM(pnl) FROM trades WHERE side='SELL'").fetchone()
-        conn.close()
-        
-        count = res[0] or 0
-        total_pnl = res[1] or 0.0
+        count, total_pnl = self.history.stats.summary()
         color = "📈" if total_pnl >= 0 else "📉"
         
-        return f"📊 **RESUMO DE PERFORMANCE**\n\n✅ Total de Vendas: {count}\n{color} PnL Acumulado: *${total_pnl:.2f}*\n💰 Ticket Médio: *${(total_pnl/count if count > 0 else 0):.2f}*"
+        report = f"📊 **RESUMO DE PERFORMANCE**\n\n✅ Total de Vendas: {count}\n{color} PnL Acumulado: *${total_pnl:.2f}*\n💰 Ticket Médio: *${(total_pnl/count if count > 0 else 0):.2f}*"
+        # Agregado por par (em memória): quem mais contribuiu para o PnL
+        pares = self.history.stats.top_symbols(5)
+        if pares:
+            report += "\n\n🏆 **POR PAR**\n" + "\n".join(f"• {s}: {n} vendas | *${p:.2f}*" for s, n, p in pares)
+        return report
 
     async def status_comando(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        conn = sqlite3.connect('trades_history.db')
-        # Pega o PnL total apenas de hoje
+        # Pega o PnL total apenas de hoje (agregado diário em memória)
         hoje = time.strftime('%Y-%m-%d')
-        res = conn.execute(f"SELECT COUNT(*), SUM(pnl) FROM trades WHERE side='SELL' AND timestamp LIKE '{hoje}%'").fetchone()
-        conn.close()
-        
-        count = res[0] or 0
-        total_pnl = res[1] or 0.0
+        count, total_pnl = self.history.stats.summary(hoje)
         
         msg = f"🤖 **STATUS ATUAL**\n\n✅ Trades Hoje: {count}\n💵 PnL Hoje: *${total_pnl:.2f}*\n🔋 Slots: {len(self.engine.active_trades)}/2"
         await update.message.reply_text(msg, parse_mode='Markdown')
 
-    async def send_notification(self, text):
-        try:
-            bot = Bot(token=self.token)
-            await bot.send_message(chat_id=self.chat_id, text=text, parse_mode='Markdown')
-        except Exception as e:
-            print(f"Erro Telegram: {e}")
-
-    async def send_chart(self, symbol, df, side, price, pnl_str=None):
-        try:
-            # 1. Prepara os dados (Pega os últimos 50 candles para não poluir)
-            df_chart = df.tail(50).copy()
-            if 'timestamp' in df_chart.columns:
-                df_chart.index = pd.to_datetime(df_chart['timestamp'], unit='ms') # Garante indice de data
-
-            # 2. Configura o Estilo (Preto e Neon - Estilo Hacker)
-            s = mpf.make_mpf_style(base_mpf_style='nightclouds', rc={'font.size': 8})
-
-            # 3. Adiciona Indicadores (Rainbow SMAs)
-            apds = [
-                mpf.make_addplot(df_chart['lower_bb'], color='green', width=0.8),
-                # Curtas (Cores Quentes)
-                mpf.make_addplot(df_chart['sma_3'], color='yellow', width=0.5),
-                mpf.make_addplot(df_chart['sma_10'], color='orange', width=0.8),
-                mpf.make_addplot(df_chart['sma_20'], color='red', width=1.0),
-                # Longas (Cores Frias/Sólidas)
-                mpf.make_addplot(df_chart['sma_50'], color='cyan', width=1.0),
-                mpf.make_addplot(df_chart['sma_100'], color='blue', width=1.2),
-                mpf.make_addplot(df_chart['sma_200'], color='purple', width=1.5),
-                mpf.make_addplot(df_chart['sma_500'], color='black', width=2.0), # A Muralha
-            ]
+    def notify(self, text):
+        """Enfileira uma notificação (não bloqueia o loop de trading)"""
+        self.outbox.put_text(text)
 
-            # 4. Salva o gráfico na memória (Buffer)
-            buf = io.BytesIO()
-            title = f"{symbol} - {side} @ {price}"
-            if pnl_str: title += f" ({pnl_str})"
-
-            mpf.plot(
-                df_chart,
-                type='candle',
-                style=s,
-                addplot=apds,
-                title=title,
-                volume=False,
-                savefig=dict(fname=buf, dpi=100, bbox_inches='tight'),
-                warn_too_much_data=10000 # Silencia avisos
-            )
-            buf.seek(0)
+    async def send_notification(self, text):
+        self.notify(text)
 
-            # 5. Envia a foto
-            bot = Bot(token=self.token)
+    async def send_chart(self, symbol, ohlcv, side, price, pnl_str=None):
+        """Enfileira o gráfico no pool de processos; o envio acontece quando o PNG fica pronto"""
+        async def _send(png):
             caption = f"📊 **ANÁLISE GRÁFICA: {symbol}**\n\n🤖 Ação: {side}\n💵 Preço: {price}\n🌈 Setup: Rainbow SMAs"
-            await bot.send_photo(chat_id=self.chat_id, photo=buf, caption=caption, parse_mode='Markdown')
-            
-            buf.close()
+            self.outbox.put_photo(png, caption)
 
+        try:
+            # Só candles crus (listas) atravessam o processo; indicadores e mplfinance rodam no worker
+            args = (list(ohlcv), Config.SMA_PERIODS, symbol, side, price, pnl_str)
+            self.charts.submit(symbol, args, _send)
         except Exception as e:
             print(f"❌ Erro ao gerar gráfico: {e}")
 
     async def start(self):
         await self.application.initialize()
+        self.outbox.mark_ready()
         await self.application.start()
-        await self.application.updater.start_polling()
\ No newline at end of file
+        await self.application.updater.start_polling()
+
+    async def stop(self):
+        await self.outbox.flush()
+        self.charts.close()
+        await self.application.updater.stop()
+        await self.application.stop()
+        await self.application.shutdown()
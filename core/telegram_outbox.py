@@ -0,0 +1,119 @@
+import asyncio
+import io
+import time
+from collections import deque
+
+from telegram.error import NetworkError, RetryAfter, TimedOut
+from core.metrics import METRICS
+
+
+class TelegramOutbox:
+    """
+    Fila única de saída para o Telegram.
+    Reusa o bot (e o pool de conexões) da Application, respeita o limite por chat,
+    junta rajadas de textos numa mensagem só e tenta de novo com backoff.
+    Para quem envia, o custo é só um append na fila.
+    """
+
+    MAX_TEXT = 4000     # O Telegram corta em 4096 caracteres
+    SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+    def __init__(self, application, chat_id, min_interval=1.0, max_retries=5):
+        self.application = application
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.items = deque()            # ('text', str) | ('photo', bytes, caption)
+        self.next_send = 0.0
+        self.worker = None
+        self.wakeup = None
+        self.ready = None
+        self.sending = False
+        self.sent = self.merged = self.dropped = 0
+
+    def _ensure_worker(self):
+        if self.worker is None or self.worker.done():
+            self.wakeup = self.wakeup or asyncio.Event()
+            self.ready = self.ready or asyncio.Event()
+            self.worker = asyncio.create_task(self._run())
+
+    def mark_ready(self):
+        """Chamado depois de Application.initialize(): a partir daqui o bot pode enviar"""
+        self._ensure_worker()
+        self.ready.set()
+
+    def put_text(self, text):
+        self.items.append(('text', text))
+        self._ensure_worker()
+        self.wakeup.set()
+
+    def put_photo(self, png, caption):
+        self.items.append(('photo', png, caption))
+        self._ensure_worker()
+        self.wakeup.set()
+
+    async def flush(self, timeout=10):
+        """Espera a fila esvaziar (usado antes de desligar)"""
+        end = time.time() + timeout
+        while (self.items or self.sending) and time.time() < end:
+            await asyncio.sleep(0.1)
+
+    def _next_batch(self):
+        item = self.items.popleft()
+        if item[0] != 'text':
+            return item
+        # Junta textos consecutivos enquanto couberem numa mensagem
+        parts = [item[1]]
+        size = len(item[1])
+        while self.items and self.items[0][0] == 'text' and size + len(self.items[0][1]) + len(self.SEPARATOR) <= self.MAX_TEXT:
+            text = self.items.popleft()[1]
+            parts.append(text)
+            size += len(text) + len(self.SEPARATOR)
+            self.merged += 1
+        return ('text', self.SEPARATOR.join(parts))
+
+    async def _run(self):
+        await self.ready.wait()
+        while True:
+            if not self.items:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            # Limite por chat: no máximo uma mensagem a cada min_interval
+            delay = self.next_send - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)   # Enquanto espera, a rajada acumula e é juntada
+
+            self.sending = True
+            try:
+                item = self._next_batch()
+                with METRICS.timer(f"telegram_{item[0]}") as t:
+                    t.outcome = 'ok' if await self._send(item) else 'dropped'
+            finally:
+                self.sending = False
+            self.next_send = time.time() + self.min_interval
+
+    async def _send(self, item):
+        bot = self.application.bot
+        backoff = 1
+        for attempt in range(self.max_retries):
+            try:
+                if item[0] == 'text':
+                    await bot.send_message(chat_id=self.chat_id, text=item[1], parse_mode='Markdown')
+                else:
+                    await bot.send_photo(chat_id=self.chat_id, photo=io.BytesIO(item[1]), caption=item[2], parse_mode='Markdown')
+                self.sent += 1
+                return True
+            except RetryAfter as e:
+                wait = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                await asyncio.sleep(float(wait))
+            except (TimedOut, NetworkError) as e:
+                print(f"⚠️ Telegram instável ({e}), tentativa {attempt + 1}/{self.max_retries}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            except Exception as e:
+                print(f"Erro Telegram: {e}")
+                break
+        self.dropped += 1
+        return False
@@ -0,0 +1,103 @@
+import re
+import time
+
+# Bases que não fazem sentido para a estratégia (stablecoins, fiat e tokens alavancados)
+STABLES = {'USDC', 'FDUSD', 'TUSD', 'BUSD', 'USDP', 'DAI', 'EUR', 'AEUR', 'EURI', 'GBP', 'TRY', 'BRL', 'USDE', 'PAXG'}
+LEVERAGED = re.compile(r'^(.+?)(UP|DOWN|BULL|BEAR)$')
+
+
+def is_leveraged(base, bases):
+    """BTCUP/BTCDOWN: só é token alavancado se, sem o sufixo, sobra outra moeda listada (JUP e SYRUP não)"""
+    match = LEVERAGED.match(base)
+    return bool(match) and match.group(1) in bases
+
+
+class UniverseScanner:
+    """
+    Universo dinâmico: um fetch_tickers de todo o mercado, ranking por volume, volatilidade e spread,
+    e os UNIVERSE_SIZE melhores viram os pares operados.
+    Histerese: quem já está no universo só sai se cair abaixo de UNIVERSE_SIZE * UNIVERSE_EXIT_FACTOR
+    (ou perder liquidez). Par com trade aberto nunca sai.
+    """
+
+    def __init__(self, exchange, config):
+        self.exchange = exchange
+        self.config = config
+        self.quote = getattr(config, 'UNIVERSE_QUOTE', 'USDT')
+        self.size = getattr(config, 'UNIVERSE_SIZE', 30)
+        self.exit_factor = getattr(config, 'UNIVERSE_EXIT_FACTOR', 1.5)
+        self.max_spread = getattr(config, 'UNIVERSE_MAX_SPREAD', 0.002)
+        self.interval = getattr(config, 'UNIVERSE_REFRESH_INTERVAL', 300)
+        self.next_scan = 0.0
+        self.ranking = []       # [(symbol, score, quoteVolume, volatilidade, spread)] do último scan
+
+    def is_due(self):
+        return time.time() >= self.next_scan
+
+    def _eligible(self, symbol, ticker, min_volume, bases):
+        market = (self.exchange.markets or {}).get(symbol)
+        if not market or market.get('quote') != self.quote or not market.get('active', False):
+            return None
+        if market.get('spot') is False:
+            return None
+        base = market.get('base') or symbol.split('/')[0]
+        if base in STABLES or is_leveraged(base, bases):
+            return None
+
+        last = ticker.get('last')
+        volume = ticker.get('quoteVolume') or 0
+        bid, ask = ticker.get('bid'), ticker.get('ask')
+        if not last or volume < min_volume or not bid or not ask:
+            return None
+        spread = (ask - bid) / ((ask + bid) / 2)
+        if spread > self.max_spread:
+            return None
+        high, low = ticker.get('high'), ticker.get('low')
+        volatility = (high - low) / last if high and low else abs(ticker.get('percentage') or 0) / 100
+        return volume, volatility, spread
+
+    def rank(self, tickers):
+        """Score = média dos percentis de volume, volatilidade e spread (quanto menor, melhor)"""
+        min_volume = getattr(self.config, 'MIN_VOLUME_24H', 0)
+        bases = {m.get('base') for m in (self.exchange.markets or {}).values()}
+        rows = []
+        for symbol, ticker in tickers.items():
+            stats = self._eligible(symbol, ticker, min_volume, bases)
+            if stats:
+                rows.append((symbol,) + stats)
+        if not rows:
+            return []
+
+        n = len(rows)
+        def percentile(col, reverse=False):
+            order = sorted(range(n), key=lambda i: rows[i][col], reverse=reverse)
+            out = [0.0] * n
+            for rank, i in enumerate(order):
+                out[i] = rank / max(1, n - 1)
+            return out
+
+        volume, volatility, spread = percentile(1), percentile(2), percentile(3, reverse=True)
+        scored = [(rows[i][0], (volume[i] + volatility[i] + spread[i]) / 3) + rows[i][1:] for i in range(n)]
+        scored.sort(key=lambda r: r[1], reverse=True)
+        return scored
+
+    def select(self, ranking, current, pinned=()):
+        """Top-N com histerese: incumbentes ficam até UNIVERSE_SIZE * UNIVERSE_EXIT_FACTOR; 'pinned' (trades abertos) sempre ficam"""
+        position = {r[0]: i for i, r in enumerate(ranking)}
+        keep_limit = int(self.size * self.exit_factor)
+        keep = [s for s in current if s in pinned or position.get(s, keep_limit) < keep_limit]
+        for s in pinned:
+            if s not in keep:
+                keep.append(s)
+        fresh = [r[0] for r in ranking if r[0] not in keep]
+        return keep + fresh[:max(0, self.size - len(keep))]
+
+    async def scan(self, current, pinned=()):
+        """Um único fetch_tickers (todos os mercados). Devolve (novo universo, tickers brutos)"""
+        self.next_scan = time.time() + 60   # Falhou (ou orçamento apertado): tenta de novo em 1 min
+        tickers = await self.exchange.fetch_tickers()
+        self.ranking = self.rank(tickers)
+        self.next_scan = time.time() + self.interval
+        if not self.ranking:
+            return list(current), tickers
+        return self.select(self.ranking, current, set(pinned)), tickers
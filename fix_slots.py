@@ -1,5 +1,6 @@
 import json
 import os
+from core.state_store import StateStore
 
 def fix_json_slots():
     path = 'active_trades.json'
@@ -11,8 +12,7 @@ def fix_json_slots():
             print(f"⚠️ Detectados {len(data)} trades ativos. O limite é 2.")
             # Mantém apenas os 2 primeiros trades para o bot não se perder
             new_data = dict(list(data.items())[:2])
-            with open(path, 'w') as f:
-                json.dump(new_data, f)
+            StateStore(path).write(new_data)
             print("✅ JSON ajustado para os 2 primeiros trades. Venda o 3º manualmente na Binance!")
         else:
             print("✅ Slots estão dentro do limite.")
@@ -0,0 +1,136 @@
+import math
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.ticker import FuncFormatter
+
+UP_COLOR = '#00ff88'
+DOWN_COLOR = '#ff3333'
+NAN = float('nan')
+
+
+class ChartView:
+    """
+    Gráfico de candles persistente do terminal.
+    Figura e artistas são criados uma vez; a cada atualização só mudam os dados.
+    Mesmo candle e mesmo preço -> não desenha nada. Só o último candle mudou -> blit.
+    """
+
+    LINES = [
+        ('upper_bb', '#3498db', 0.7),
+        ('lower_bb', '#3498db', 0.7),
+        ('sma_20', '#f1c40f', 0.8),
+        ('sma_200', 'orange', 1.5),
+    ]
+
+    def __init__(self, fig, ax, canvas, window=60):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.window = window
+        self.background = None
+        self.key = None
+        self.symbol = None
+        self.first_ts = None
+        self.entry = None
+        self.times = []
+        self.segments = []
+        self.verts = []
+        self.colors = []
+
+        ax.tick_params(colors='white', labelsize=8)
+        ax.grid(color='#222222', linewidth=0.5)
+        for spine in ax.spines.values():
+            spine.set_color('#333333')
+        ax.xaxis.set_major_formatter(FuncFormatter(self._format_time))
+
+        self.wicks = LineCollection([], linewidths=0.8, animated=True)
+        self.bodies = PolyCollection([], linewidths=0, animated=True)
+        ax.add_collection(self.wicks)
+        ax.add_collection(self.bodies)
+        self.lines = {col: ax.plot([], [], color=color, linewidth=width, animated=True)[0]
+                      for col, color, width in self.LINES}
+        self.entry_line, = ax.plot([], [], color='#2ecc71', linewidth=1.5, linestyle='--', animated=True)
+        self.entry_text = ax.text(0, 0, '', color='#2ecc71', fontweight='bold', animated=True,
+                                  bbox=dict(facecolor='black', alpha=0.6))
+        self.rsi_text = ax.text(0.02, 0.95, '', transform=ax.transAxes, color='white', weight='bold', animated=True,
+                                bbox=dict(facecolor='black', alpha=0.7))
+        self.artists = [self.wicks, self.bodies, *self.lines.values(), self.entry_line, self.entry_text, self.rsi_text]
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _format_time(self, x, pos=None):
+        i = int(round(x))
+        return self.times[i].strftime('%H:%M') if 0 <= i < len(self.times) else ''
+
+    def _on_draw(self, event):
+        # Fundo (eixos, grid, labels) guardado para os próximos blits
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    @staticmethod
+    def _candle(i, o, h, l, c):
+        w = 0.3
+        top, bottom = max(o, c), min(o, c)
+        return [(i, l), (i, h)], [(i - w, bottom), (i - w, top), (i + w, top), (i + w, bottom)], UP_COLOR if c >= o else DOWN_COLOR
+
+    def update(self, symbol, df, trade_info=None):
+        df = df.tail(self.window)
+        if df.empty:
+            return
+        last_close = float(df['close'].iloc[-1])
+        entry = float(trade_info['entry']) if trade_info and trade_info.get('entry') else None
+        key = (symbol, df.index[-1], last_close, entry)
+        if key == self.key:
+            return
+        self.key = key
+
+        full = symbol != self.symbol or df.index[0] != self.first_ts or entry != self.entry or len(df) != len(self.verts)
+        self.symbol, self.first_ts, self.entry = symbol, df.index[0], entry
+
+        rows = df[['open', 'high', 'low', 'close']].to_numpy(dtype=float)
+        if full:
+            self.times = list(df.index)
+            candles = [self._candle(i, *row) for i, row in enumerate(rows)]
+            self.segments = [c[0] for c in candles]
+            self.verts = [c[1] for c in candles]
+            self.colors = [c[2] for c in candles]
+        else:
+            i = len(rows) - 1
+            self.segments[i], self.verts[i], self.colors[i] = self._candle(i, *rows[i])
+
+        self.wicks.set_segments(self.segments)
+        self.wicks.set_colors(self.colors)
+        self.bodies.set_verts(self.verts)
+        self.bodies.set_facecolors(self.colors)
+
+        x = list(range(len(df)))
+        for col, line in self.lines.items():
+            line.set_data(x, df[col].to_numpy(dtype=float) if col in df.columns else [NAN] * len(x))
+
+        if entry:
+            self.entry_line.set_data([0, len(x) - 1], [entry, entry])
+            self.entry_text.set_position((min(5, len(x) - 1), entry))
+            self.entry_text.set_text(f" COMPRA: ${entry:.2f}")
+        else:
+            self.entry_line.set_data([], [])
+            self.entry_text.set_text('')
+
+        rsi = float(df['rsi'].iloc[-1]) if 'rsi' in df.columns else NAN
+        self.rsi_text.set_text(f"RSI: {rsi:.1f}" if not math.isnan(rsi) else "RSI: --")
+
+        low, high = float(df['low'].min()), float(df['high'].max())
+        if entry:
+            low, high = min(low, entry), max(high, entry)
+        y0, y1 = self.ax.get_ylim()
+        if full or self.background is None or low < y0 or high > y1:
+            pad = (high - low) * 0.05 or high * 0.001
+            self.ax.set_xlim(-1, self.window)
+            self.ax.set_ylim(low - pad, high + pad)
+            self.ax.set_title(f"MONITORANDO: {symbol}", color="#00ffcc", loc='left')
+            self.canvas.draw_idle()   # Redesenho completo (o draw_event recaptura o fundo)
+            return
+
+        # Só o último candle/valor mudou: restaura o fundo e redesenha apenas os artistas
+        self.canvas.restore_region(self.background)
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
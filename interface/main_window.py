@@ -2,10 +2,11 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk
 import matplotlib.pyplot as plt
-import mplfinance as mpf
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import queue, threading, asyncio, time, os
 from core.telegram_bot import TelegramManager
+from interface.chart_view import ChartView
+from core.scheduler import CycleScheduler
 
 class MultiPairTradingInterface:
     def __init__(self, root, engine_class, config):
@@ -18,6 +19,13 @@ class MultiPairTradingInterface:
         self.loop = asyncio.new_event_loop()
         self.selected_symbol = self.config.PAIRS[0]['symbol']
         self.cached_data = {}
+        self.row_ids = {}        # symbol -> id da linha na tabela
+        self.row_cache = {}      # symbol -> (valores, tag) já exibidos
+        self.pending_pairs = {}  # Último dado de cada par ainda não desenhado
+        self.pending = {}
+        self.last_frame = 0.0
+        self.chart_request = None  # Future do DataFrame pedido ao motor (um por vez)
+        self.chart_wanted = None   # Par do pedido mais recente que ainda espera o anterior terminar
         
         self.fig, self.ax = plt.subplots(figsize=(8, 5), dpi=100)
         self.fig.patch.set_facecolor('#0e0e0e')
@@ -31,11 +39,18 @@ class MultiPairTradingInterface:
 
     def _run_async_loop(self):
         asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._main_loop())
+
+    async def _main_loop(self):
+        # O loop fica sempre rodando: stream, Telegram e comandos da GUI não esperam o próximo ciclo
+        if self.config.ENGINE_LOOP == 'SCHEDULER':
+            await CycleScheduler(self.engine, self.config).run()
+            return
         while True:
             try:
-                self.loop.run_until_complete(self.engine.trading_cycle())
-                time.sleep(1)
+                await self.engine.trading_cycle()
             except: pass
+            await asyncio.sleep(1)
 
     def setup_ui(self):
         self.root.title("QuantumCore v44.0 - Elite Terminal")
@@ -95,6 +110,7 @@ class MultiPairTradingInterface:
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_container)
         self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=15, pady=15)
+        self.chart = ChartView(self.fig, self.ax, self.canvas)
 
         # Base: Logs
         self.log_container = ctk.CTkFrame(self.right_pane, fg_color="#0a0a0a", corner_radius=0)
@@ -109,65 +125,102 @@ class MultiPairTradingInterface:
             if self.selected_symbol in self.cached_data: self.render_chart(self.cached_data[self.selected_symbol])
 
     def process_queue(self):
+        # Esvazia a fila de uma vez: de cada par fica só o dado mais recente (o resto é descartado)
+        logs = []
         try:
-            while not self.update_queue.empty():
+            while True:
                 mtype, data = self.update_queue.get_nowait()
                 if mtype == 'pairs_data':
-                    for r in data:
-                        self.cached_data[r['symbol']] = r
-                        
-                        # --- LÓGICA DE STATUS VISUAL (TRAILING) ---
-                        display_status = r['status']
-                        if r.get('trade_info'):
-                            highest = r['trade_info'].get('highest_price', 0)
-                            if highest > 0:
-                                display_status = "🚀 TRAILING"
-                        
-                        tag = 'buy_signal' if "COMPRA" in r['status'] else ('bought' if "COMPRADO" in r['status'] or "TRAILING" in display_status else ('selling' if "VENDENDO" in r['status'] else ''))
-                        found = False
-                        for item in self.tree.get_children():
-                            if self.tree.item(item, 'values')[0] == r['symbol']:
-                                self.tree.item(item, values=(r['symbol'], f"${r['price']:.2f}", f"{r['rsi']:.0f}", display_status), tags=(tag,))
-                                found = True; break
-                        if not found: self.tree.insert("", "end", values=(r['symbol'], f"${r['price']:.2f}", f"{r['rsi']:.0f}", display_status), tags=(tag,))
-                        if r['symbol'] == self.selected_symbol: self.render_chart(r)
-                elif mtype == 'portfolio':
+                    for r in data: self.pending_pairs[r['symbol']] = r
+                elif mtype == 'universe':
+                    self._apply_universe(set(data))
+                elif mtype in ('portfolio', 'trade_history'):
+                    self.pending[mtype] = data
+                elif mtype == 'chart_frame':
+                    self.pending['chart_frame'] = data
+                elif mtype == 'log':
+                    logs.append(f"[{time.strftime('%H:%M:%S')}] > {data}\n")
+        except queue.Empty: pass
+
+        try:
+            if logs:
+                self.log_box.insert("end", "".join(logs)); self.log_box.see("end")
+
+            # Limite de quadros: a tabela é redesenhada no máximo a cada GUI_FRAME_INTERVAL
+            now = time.time()
+            if now - self.last_frame >= getattr(self.config, 'GUI_FRAME_INTERVAL', 0.25):
+                self.last_frame = now
+                self._apply_pairs(self.pending_pairs)
+                self.pending_pairs = {}
+                if 'portfolio' in self.pending:
+                    data = self.pending.pop('portfolio')
                     self.lbl_cap.configure(text=f"Saldo: ${data['available_capital']:.2f}")
                     pnl = data['floating_pnl']
                     self.lbl_pnl.configure(text=f"PnL Aberto: ${pnl:.2f}", text_color="#2ecc71" if pnl>=0 else "#e74c3c")
-                elif mtype == 'trade_history':
-                    for i in self.tree_hist.get_children(): self.tree_hist.delete(i)
-                    for r in data: self.tree_hist.insert("", "end", values=(r[0], f"${r[1]:.2f}"))
-                elif mtype == 'log':
-                    self.log_box.insert("end", f"[{time.strftime('%H:%M:%S')}] > {data}\n"); self.log_box.see("end")
+                if 'trade_history' in self.pending:
+                    self._apply_history(self.pending.pop('trade_history'))
+                if 'chart_frame' in self.pending:
+                    symbol, df = self.pending.pop('chart_frame')
+                    if symbol == self.selected_symbol and df is not None:
+                        trade = self.cached_data.get(symbol, {}).get('trade_info')
+                        self.chart.update(symbol, df, trade)
+            self._request_chart()
         except: pass
         self.root.after(100, self.process_queue)
 
+    def _apply_pairs(self, pairs):
+        for s, r in pairs.items():
+            self.cached_data[s] = r
+
+            # --- LÓGICA DE STATUS VISUAL (TRAILING) ---
+            display_status = r['status']
+            if r.get('trade_info'):
+                highest = r['trade_info'].get('highest_price', 0)
+                if highest > 0:
+                    display_status = "🚀 TRAILING"
+
+            tag = 'buy_signal' if "COMPRA" in r['status'] else ('bought' if "COMPRADO" in r['status'] or "TRAILING" in display_status else ('selling' if "VENDENDO" in r['status'] else ''))
+            row = ((s, f"${r['price']:.2f}", f"{r['rsi']:.0f}", display_status), tag)
+
+            # Índice símbolo -> linha: sem varrer a tabela, e só toca no Tk se o texto mudou
+            iid = self.row_ids.get(s)
+            if iid is None:
+                self.row_ids[s] = self.tree.insert("", "end", values=row[0], tags=(row[1],))
+            elif self.row_cache.get(s) != row:
+                self.tree.item(iid, values=row[0], tags=(row[1],))
+            self.row_cache[s] = row
+            if s == self.selected_symbol: self.render_chart(r)
+
+    def _apply_universe(self, symbols):
+        # Pares que saíram do universo (modo SCAN) somem da tabela
+        for s in [s for s in self.row_ids if s not in symbols]:
+            self.tree.delete(self.row_ids.pop(s))
+            self.row_cache.pop(s, None)
+            self.pending_pairs.pop(s, None)
+            self.cached_data.pop(s, None)
+
+    def _apply_history(self, data):
+        rows = [(r[0], f"${r[1]:.2f}") for r in data]
+        items = self.tree_hist.get_children()
+        for i, values in enumerate(rows):
+            if i < len(items):
+                if tuple(self.tree_hist.item(items[i], 'values')) != values:
+                    self.tree_hist.item(items[i], values=values)
+            else:
+                self.tree_hist.insert("", "end", values=values)
+        for iid in items[len(rows):]: self.tree_hist.delete(iid)
+
     def render_chart(self, data):
-        self.ax.clear()
-        df = data['df'].tail(60)
-        mc = mpf.make_marketcolors(up='#00ff88', down='#ff3333', inherit=True)
-        s = mpf.make_mpf_style(base_mpl_style='dark_background', marketcolors=mc, facecolor='#0e0e0e')
-        add_plots = [
-            mpf.make_addplot(df['upper_bb'], color='#3498db', width=0.7, ax=self.ax),
-            mpf.make_addplot(df['lower_bb'], color='#3498db', width=0.7, ax=self.ax),
-            mpf.make_addplot(df['ma20'], color='#f1c40f', width=0.8, ax=self.ax)
-        ]
-        
-        # --- VISUALIZAÇÃO DA EMA 200 ---
-        if 'ema200' in df.columns and not df['ema200'].isnull().all():
-            add_plots.append(mpf.make_addplot(df['ema200'], color='orange', width=1.5, ax=self.ax))
-            
-        if data.get('trade_info'):
-            entry = data['trade_info']['entry']
-            add_plots.append(mpf.make_addplot([entry]*len(df), color='#2ecc71', width=1.5, linestyle='--', ax=self.ax))
-            self.ax.text(df.index[5], entry, f" COMPRA: ${entry:.2f}", color='#2ecc71', fontweight='bold', bbox=dict(facecolor='black', alpha=0.6))
-        
-        curr_rsi = df['rsi'].iloc[-1]
-        self.ax.text(0.02, 0.95, f"RSI: {curr_rsi:.1f}", transform=self.ax.transAxes, color='white', weight='bold', bbox=dict(facecolor='black', alpha=0.7))
-        mpf.plot(df, type='candle', ax=self.ax, style=s, addplot=add_plots)
-        self.ax.set_title(f"MONITORANDO: {data['symbol']}", color="#00ffcc", loc='left')
-        self.canvas.draw_idle()
+        # O DataFrame é montado pelo motor e volta pela fila ('chart_frame'); o Tk só desenha
+        self.chart_wanted = data['symbol']
+        self._request_chart()
+
+    def _request_chart(self):
+        # Um pedido por vez; o mais recente (ex: troca de par) sai assim que o anterior terminar
+        if self.chart_wanted is None or (self.chart_request is not None and not self.chart_request.done()):
+            return
+        symbol, self.chart_wanted = self.chart_wanted, None
+        self.chart_request = asyncio.run_coroutine_threadsafe(self.engine.chart_frame(symbol), self.loop)
 
     def start_bot(self): asyncio.run_coroutine_threadsafe(self.engine.start(), self.loop)
     def stop_bot(self): asyncio.run_coroutine_threadsafe(self.engine.stop(), self.loop)
@@ -177,11 +230,18 @@ class MultiPairTradingInterface:
         print("🛑 Encerrando sistema de forma segura...")
         # 1. Para o Motor
         self.engine.running = False
+        self.engine.state.close() # Grava trades ativos pendentes antes de sair
+
+        # 2. Esvazia a fila do Telegram (rajadas agrupadas ainda não enviadas) e desliga o bot, como no server.py
+        try:
+            asyncio.run_coroutine_threadsafe(self.telegram.stop(), self.loop).result(timeout=15)
+        except Exception as e:
+            print(f"⚠️ Telegram não encerrou a tempo: {e}")
+
+        # 3. Para o loop do asyncio
+        self.loop.call_soon_threadsafe(self.loop.stop)
         
-        # 2. Para o loop do asyncio
-        self.loop.call_soon_threadsafe(self.loop.stop())
-        
-        # 3. Fecha a janela
+        # 4. Fecha a janela
         self.root.destroy()
         # Força a saída do processo caso threads ainda existam
         os._exit(0)
@@ -0,0 +1,52 @@
+import argparse
+import time
+from core.config import Config
+from core.backtest import load_history
+from core.optimizer import ParameterSweep, grid, sample, space, rank, write_report
+
+# Grade e faixas padrão vêm do TUNABLE (core/optimizer.py), em torno dos valores atuais do Config
+GRID = space('grid')
+RANGES = space('ranges')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros do Config sobre o histórico do backtest")
+    parser.add_argument('--samples', type=int, default=0, help="N combinações aleatórias (0 = grade completa)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--metric', default='pnl', choices=['pnl', 'win_rate', 'max_drawdown', 'trades'])
+    parser.add_argument('--min-trades', type=int, default=30)
+    parser.add_argument('--timeframe', default=getattr(Config, 'TIMEFRAME', '1m'))
+    parser.add_argument('--out', default='optimizer_report.csv')
+    args = parser.parse_args()
+
+    data = load_history(Config.BACKTEST_DATA_DIR, [p['symbol'] for p in Config.PAIRS], args.timeframe)
+    if not data:
+        print("❌ Sem histórico. Rode 'python backtest.py --download' primeiro.")
+        return
+
+    combos = sample(RANGES, args.samples, args.seed) if args.samples else grid(GRID)
+    sweep = ParameterSweep(data, Config, workers=args.workers)
+    print(f"🧮 {len(combos)} combinações | {len(data)} pares | indicadores em {sweep.prepare_seconds:.1f}s | {sweep.workers} processos")
+
+    t0 = time.perf_counter()
+    step = max(1, len(combos) // 20)
+    progress = lambda done, total: done % step < sweep.batch_size and print(f"   {done}/{total} ({time.perf_counter() - t0:.0f}s)")
+    try:
+        results = sweep.run(combos, progress)
+    finally:
+        sweep.close()
+    elapsed = time.perf_counter() - t0
+
+    ranked = rank(results, args.metric, args.min_trades)
+    write_report(ranked, args.out)
+    print(f"⏱️ {len(results)} combinações em {elapsed:.0f}s ({len(results) / elapsed * 3600:.0f}/hora)")
+    print(f"🏆 Top 10 por {args.metric} (relatório completo em {args.out}):")
+    for i, (combo, summary) in enumerate(ranked[:10], 1):
+        params = ", ".join(f"{k}={v:.4g}" for k, v in combo.items())
+        print(f"{i:>3}. PnL ${summary['pnl']:.2f} | {summary['trades']} trades | acerto {summary['win_rate']*100:.1f}% "
+              f"| DD ${summary['max_drawdown']:.2f} | {params}")
+
+
+if __name__ == "__main__":
+    main()
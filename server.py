@@ -6,6 +6,9 @@ import sys
 from core.engine import TradingEngine
 from core.config import Config
 from core.telegram_bot import TelegramManager
+from core.scheduler import CycleScheduler
+from core.metrics import METRICS, serve_metrics
+from core.sharding import ShardSupervisor
 
 # Configuração de Log para aparecer no terminal
 logging.basicConfig(
@@ -31,35 +34,79 @@ async def main_server():
     
     # 4. Inicializa o Motor
     print("⚙️  Ligando os motores...")
-    engine = TradingEngine(update_queue, config, telegram=telegram)
-    engine.running = True
+    supervisor = None
+    if config.ENGINE_SHARDS > 1:
+        # Pares divididos entre processos; slots, estado, histórico e Telegram ficam aqui
+        supervisor = ShardSupervisor(update_queue, config, telegram=telegram)
+        telegram.engine = supervisor
+        await supervisor.start()
+        asyncio.create_task(supervisor.run())
+        engine = supervisor
+    else:
+        engine = TradingEngine(update_queue, config, telegram=telegram)
+        telegram.engine = engine # /status e relatórios usam o histórico e os slots do motor
+        engine.running = True
+        await engine.start_stream() # Só conecta se MARKET_DATA_MODE=STREAM
+        await engine.executor.start() # Conexão quente + offset do relógio para as ordens
     
+    # Métricas (Prometheus): GET http://<servidor>:METRICS_PORT/metrics
+    if config.METRICS_PORT:
+        try:
+            await serve_metrics(config.METRICS_HOST, config.METRICS_PORT)
+            print(f"📈 Métricas em {config.METRICS_HOST}:{config.METRICS_PORT}/metrics")
+        except OSError as e:
+            # Porta ocupada (ex: segunda instância): o bot sobe mesmo sem o endpoint
+            logging.warning(f"⚠️ Métricas desligadas: não deu para abrir {config.METRICS_HOST}:{config.METRICS_PORT} ({e})")
+    last_metrics_report = time.time()
+
     # Envia aviso de subida
     await telegram.send_notification("☁️ **BOT ONLINE NA NUVEM**\n\nModo: Headless Server\nStatus: Monitorando 24/7 🚀")
 
     # 5. Loop Principal (Infinito)
+    # ENGINE_LOOP=SCHEDULER: entradas por fechamento de candle + saídas priorizadas, uma task por par
+    scheduler = None
+    if config.ENGINE_LOOP == 'SCHEDULER' and supervisor is None:
+        scheduler = CycleScheduler(engine, config)
+        asyncio.create_task(scheduler.run())
+
+    reason = "⚠️ **BOT DESLIGADO**"
     try:
         while True:
-            # Executa um ciclo de trade
-            await engine.trading_cycle()
+            # Executa um ciclo de trade (no modo agendador o ciclo roda sozinho)
+            if scheduler is None and supervisor is None:
+                await engine.trading_cycle()
             
             # Processa logs da fila (para mostrar no terminal preto do servidor)
             while not update_queue.empty():
                 msg_type, msg_content = update_queue.get()
                 if msg_type == 'log':
                     logging.info(f"[ENGINE] {msg_content}")
+
+            # Resumo periódico das latências no log
+            if time.time() - last_metrics_report >= config.METRICS_REPORT_INTERVAL:
+                last_metrics_report = time.time()
+                logging.info(f"[ENGINE] {METRICS.summary()}")
             
             # Pequena pausa para não fritar a CPU do servidor
             await asyncio.sleep(1)
             
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # Ctrl+C dentro do asyncio.run chega aqui como CancelledError (a task principal é cancelada)
         print("\n🛑 Parando servidor...")
-        await telegram.send_notification("⚠️ **BOT DESLIGADO MANUALMENTE**")
-        await telegram.stop()
+        reason = "⚠️ **BOT DESLIGADO MANUALMENTE**"
     except Exception as e:
         print(f"❌ ERRO FATAL: {e}")
-        await telegram.send_notification(f"☠️ **CRASH DO SISTEMA**: {e}")
+        reason = f"☠️ **CRASH DO SISTEMA**: {e}"
         raise
+    finally:
+        # Encerramento sempre grava o estado pendente (janela do StateStore) e esvazia a fila do Telegram
+        try:
+            if supervisor: await supervisor.stop()
+            engine.state.close()
+            await telegram.send_notification(reason)
+            await telegram.stop()
+        except Exception as e:
+            print(f"⚠️ Erro no encerramento: {e}")
 
 if __name__ == "__main__":
     try:
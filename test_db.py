@@ -1,26 +1,14 @@
-import sqlite3
+import asyncio
 import time
+from core.history import TradeHistory
 
 def injetar_trade_teste():
     db_path = 'trades_history.db'
     print(f"📂 Conectando ao banco: {db_path}")
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # 1. Garante que a tabela existe (igual ao Engine)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT,
-                side TEXT,
-                price REAL,
-                qty REAL,
-                pnl REAL,
-                timestamp TEXT
-            )
-        """)
+        # 1. Mesmo repositório do Engine (cria a tabela/índices se não existirem)
+        history = TradeHistory(db_path)
 
         # 2. Dados do Trade de Teste
         symbol = "TESTE/USDT"
@@ -29,20 +17,16 @@ def injetar_trade_teste():
         pnl = 5.50  # Lucro fictício de $5.50
         timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
 
-        # 3. Inserção
+        # 3. Inserção (grava no banco e atualiza os agregados deste processo)
         print("💉 Injetando trade de teste...")
-        cursor.execute(
-            "INSERT INTO trades (symbol, side, price, qty, pnl, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-            (symbol, 'SELL', price, qty, pnl, timestamp)
-        )
-        
-        conn.commit()
-        conn.close()
+        asyncio.run(history.record(symbol, 'SELL', price, qty, pnl, timestamp))
+        history.close()
         print(f"✅ SUCESSO! Trade gravado: {symbol} | Lucro: ${pnl}")
-        print("📱 AGORA: Vá no seu Telegram e digite /relatorio")
-        
+        # Os relatórios vêm dos agregados em memória, carregados do banco só na inicialização do bot
+        print("📱 AGORA: Reinicie o bot e digite /start -> Resumo no seu Telegram")
+
     except Exception as e:
         print(f"❌ ERRO no Banco de Dados: {e}")
 
 if __name__ == "__main__":
-    injetar_trade_teste()
\ No newline at end of file
+    injetar_trade_teste()